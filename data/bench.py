@@ -0,0 +1,707 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from stub_server import LIST_PATH, run_stub_server
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+REGRESSION_THRESHOLD = 0.25
+
+def load_fixtures(pattern):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, pattern))):
+        with open(path, encoding='utf-8') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    return fixtures
+
+def time_per_call(fn, arg, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.process_time() - started) / repeat
+
+def measure(fn, arg, repeat=200):
+    # 처리량(ops/s)은 tracemalloc 없이, 할당량은 한 번 호출할 때의 최대 추적 메모리(KB)로 따로 잰다
+    fn(arg)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    ops = repeat / (time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'ops': ops, 'alloc_kb': peak / 1024}
+
+def bench_parsers(repeat=200):
+    # 기록된 고정 HTML로 파서별 처리량/할당량 측정. 반환값은 check_regressions에 그대로 넘긴다
+    from bs4 import BeautifulSoup
+    from detail_parser import extract_image_urls, parse_detail_page, parse_program_schedule
+    from filter import extract_price
+    from url_type import extract_url_and_type, parse_listing_page
+
+    cases = []
+    for name, html in load_fixtures('listing_*.html'):
+        items = BeautifulSoup(html, 'html.parser').select('div.myplace_list > ul > li')
+        cases.append((f"parse_listing_page[{name}]", parse_listing_page, html))
+        cases.append((f"extract_url_and_type[{name}]", lambda lis: [extract_url_and_type(li) for li in lis], items))
+    for name, html in load_fixtures('detail_*.html'):
+        soup = BeautifulSoup(html, 'html.parser')
+        schedule_table = str(soup.select('div.table table')[-1])
+        cases.append((f"parse_detail_page[{name}]", parse_detail_page, html))
+        cases.append((f"parse_program_schedule[{name}]", parse_program_schedule, schedule_table))
+        cases.append((f"extract_image_urls[{name}]", extract_image_urls, soup))
+    for name, html in load_fixtures('price_*.html') + load_fixtures('detail_basic.html'):
+        # filter.py와 같이 soup 생성까지 포함
+        cases.append((f"extract_price[{name}]", lambda h: extract_price(BeautifulSoup(h, 'html.parser')), html))
+
+    results = {}
+    for name, fn, arg in cases:
+        results[name] = measure(fn, arg, repeat)
+        print(f"[parser] {name}: {results[name]['ops']:.0f} ops/s, 최대 할당 {results[name]['alloc_kb']:.1f}KB")
+    return results
+
+PIPELINE_SCHEMA = [
+    """CREATE TABLE templestay (
+        id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, templestay_name TEXT, temple_name TEXT,
+        address TEXT, phone TEXT, introduction TEXT, schedule TEXT, content_hash TEXT, updated_at TEXT
+    )""",
+    "CREATE TABLE filter (templestay_id INTEGER PRIMARY KEY, type INTEGER, activity INTEGER, region INTEGER, "
+    "etc INTEGER, price INTEGER, content_hash TEXT)",
+    "CREATE TABLE image (id INTEGER PRIMARY KEY, templestay_id INTEGER NOT NULL, img_url TEXT NOT NULL, created_at TEXT)",
+]
+
+def bench_pipeline(total_pages=5, items_per_page=10, latency=0.005, workers=8, batch_size=10):
+    """목록 수집 → URL 저장 → 상세 페치/파싱 → 저장까지 운영 함수 그대로 실행.
+    로컬 스텁 서버와, db 풀에 꽂은 SQLite 대용 연결(sqlite_db)을 쓴다"""
+    import logging
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    import db
+    import templestay
+    import url_type
+    from crawl_state import CrawlJournal
+    from fetcher import FallbackFetcher, HttpStrategy, create_session
+    from page_cache import PageCache
+    from sqlite_db import SqliteConnection, sqlite_connector
+    from stub_server import DETAIL_PATH
+    from throttle import AdaptiveRateLimiter, PoliteSession
+    from url_index import UrlIndex
+
+    # templestay가 페이지마다 남기는 INFO 로그는 측정 중에는 끈다
+    root_logger = logging.getLogger()
+    log_level = root_logger.level
+    root_logger.setLevel(logging.WARNING)
+
+    detail_html = dict(load_fixtures('detail_basic.html'))['detail_basic.html']
+    with tempfile.TemporaryDirectory() as tmp, \
+            run_stub_server(total_pages, items_per_page, latency, detail_html=detail_html) as server:
+        db_path = os.path.join(tmp, 'bench.sqlite')
+        setup = SqliteConnection(db_path)
+        with setup.cursor() as cursor:
+            for sql in PIPELINE_SCHEMA:
+                cursor.execute(sql)
+        setup.commit()
+        db.init_pool(size=workers + 2, config={}, connect=sqlite_connector(db_path))
+
+        cache = PageCache(os.path.join(tmp, 'page_cache.sqlite'))
+        url_index = UrlIndex(os.path.join(tmp, 'url_index.sqlite'))
+        journal = CrawlJournal(os.path.join(tmp, 'crawl_state.sqlite'))
+        session = PoliteSession(create_session(pool_size=workers),
+                                AdaptiveRateLimiter(initial_rate=1000.0, max_rate=1000.0))
+        base_url = server.base_url + LIST_PATH + "?pageIndex="
+
+        async def store(pages):
+            async with db.get_async_pool().connection() as conn:
+                await url_type.store_pages(conn, pages, url_index, 100)
+
+        try:
+            started = time.perf_counter()
+            pages = asyncio.run(url_type.fetch_listing_pages(1, total_pages + 1, base_url, workers, 1000.0,
+                                                             cache=cache))
+            asyncio.run(store(pages))
+            listing_elapsed = time.perf_counter() - started
+
+            # 예약 URL은 실제 사이트 주소이므로 스텁 서버 주소로 바꿔 요청
+            with setup.cursor() as cursor:
+                cursor.execute("SELECT id, url FROM templestay ORDER BY id")
+                rows = [(tid, server.base_url + DETAIL_PATH + "?" + url.split("?", 1)[1], None)
+                        for tid, url in cursor.fetchall()]
+            batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+
+            def fetcher_factory():
+                return FallbackFetcher([HttpStrategy(session, cache=cache)])
+
+            started = time.perf_counter()
+            journal.begin_run()
+            writer = templestay.create_writer(journal, flush_interval=0.5)
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for future in [executor.submit(templestay.process_url_batch, batch, writer, journal, fetcher_factory)
+                                   for batch in batches]:
+                        future.result()
+            finally:
+                written = writer.close()
+            detail_elapsed = time.perf_counter() - started
+
+            with setup.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM templestay WHERE templestay_name IS NOT NULL")
+                stored = cursor.fetchone()[0]
+                cursor.execute("SELECT COUNT(*) FROM image")
+                images = cursor.fetchone()[0]
+                cursor.execute("SELECT COUNT(*) FROM filter WHERE type IS NOT NULL")
+                filtered = cursor.fetchone()[0]
+        finally:
+            db.close_pool()
+            setup.close()
+            journal.close()
+            url_index.close()
+            cache.close()
+            root_logger.setLevel(log_level)
+
+    expected = total_pages * items_per_page
+    assert stored == filtered == len(rows) == expected == written['templestay'], "상세 페이지 저장 건수 불일치"
+    assert images == written['image'] and images > 0, "이미지 저장 건수 불일치"
+    listing_rate = len(pages) / listing_elapsed
+    detail_rate = len(rows) / detail_elapsed
+    print(f"[pipeline] 목록 {len(pages)}페이지 {listing_rate:.0f} pages/s, "
+          f"상세 {len(rows)}건 {detail_rate:.0f} pages/s, 이미지 {images}건 (요청 {server.hits}회)")
+    return {'pipeline.listing': {'pages_per_sec': listing_rate}, 'pipeline.detail': {'pages_per_sec': detail_rate}}
+
+def flatten_results(results):
+    return {f"{name}.{metric}": value for name, metrics in results.items() for metric, value in metrics.items()}
+
+def check_regressions(current, baseline, threshold=REGRESSION_THRESHOLD):
+    # 처리량은 낮아질 때, 할당량은 커질 때 threshold 비율을 넘으면 회귀로 본다
+    regressions = []
+    for key, base in baseline.items():
+        value = current.get(key)
+        if value is None or not base:
+            continue
+        if key.endswith('.alloc_kb'):
+            change = value / base - 1
+        else:
+            change = 1 - value / base
+        if change > threshold:
+            regressions.append((key, base, value, change))
+    return regressions
+
+def run_tracked():
+    results = bench_parsers()
+    results.update(bench_pipeline())
+    return flatten_results(results)
+
+def bench_listing(total_pages=30, end_page=50, latency=0.1, concurrency=8, rate_per_host=20.0):
+    # 두 방식 모두 빈 임시 캐시로 시작 (작업 디렉터리의 page_cache.sqlite는 건드리지 않음)
+    import tempfile
+    import url_type
+    from page_cache import PageCache
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            run_stub_server(total_pages=total_pages, latency=latency) as server:
+        base_url = server.base_url + LIST_PATH + "?pageIndex="
+        sync_cache = PageCache(os.path.join(tmp, 'sync_cache.sqlite'))
+        async_cache = PageCache(os.path.join(tmp, 'async_cache.sqlite'))
+
+        try:
+            started = time.perf_counter()
+            sync_pages = list(url_type.iter_listing_pages(1, end_page, base_url, cache=sync_cache))
+            sync_elapsed = time.perf_counter() - started
+            sync_hits = server.hits
+
+            server.hits = 0
+            started = time.perf_counter()
+            async_pages = asyncio.run(url_type.fetch_listing_pages(1, end_page, base_url, concurrency, rate_per_host,
+                                                                   cache=async_cache))
+            async_elapsed = time.perf_counter() - started
+            async_hits = server.hits
+        finally:
+            sync_cache.close()
+            async_cache.close()
+
+    print(f"[listing] sync : {len(sync_pages)}페이지, 요청 {sync_hits}회, {sync_elapsed:.2f}s")
+    print(f"[listing] async: {len(async_pages)}페이지, 요청 {async_hits}회, {async_elapsed:.2f}s")
+    print(f"[listing] 속도 향상 x{sync_elapsed / async_elapsed:.1f}")
+
+def bench_detail_parse(repeat=200):
+    from detail_parser import parse_detail_page, parse_detail_page_bs4
+
+    for name, html in load_fixtures('detail_*.html'):
+        assert parse_detail_page(html) == parse_detail_page_bs4(html), f"{name}: 파서 결과 불일치"
+        bs4_ms = time_per_call(parse_detail_page_bs4, html, repeat) * 1000
+        lxml_ms = time_per_call(parse_detail_page, html, repeat) * 1000
+        print(f"[detail] {name}: bs4 {bs4_ms:.3f}ms, 단일 패스 {lxml_ms:.3f}ms (x{bs4_ms / lxml_ms:.1f})")
+
+def bench_parse_pool(pages=300, fetch_workers=16, latency=0.02, filler=400):
+    # 페치(네트워크 대기)는 sleep으로 흉내내고, 파싱을 스레드 안에서 할 때와 프로세스 풀에 넘길 때를 비교
+    from concurrent.futures import ThreadPoolExecutor
+    from detail_parser import parse_detail_page
+    from fetcher import ProcessParser
+
+    # 실제 상세 페이지 크기(수십~수백 KB)에 맞춰 본문 밖에 메뉴/푸터 마크업을 덧붙인다
+    html = dict(load_fixtures('detail_basic.html'))['detail_basic.html']
+    padding = "".join(f"<div class=\"menu\"><ul><li><a href=\"/m/{i}\">메뉴 {i}</a></li></ul></div>" for i in range(filler))
+    html = html.replace("</body>", padding + "</body>")
+    expected = parse_detail_page(html)
+
+    def fetch_and_parse(parse):
+        time.sleep(latency)
+        return parse(html)
+
+    def run(parse):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+            results = list(executor.map(lambda _: fetch_and_parse(parse), range(pages)))
+        assert all(result == expected for result in results)
+        return pages / (time.perf_counter() - started)
+
+    print(f"[parse] 페이지 {len(html) // 1024}KB, 페치 스레드 {fetch_workers}개, CPU {os.cpu_count()}개")
+    print(f"[parse] 스레드 안에서 파싱: {run(parse_detail_page):.0f} pages/s")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        parser = ProcessParser(parse_detail_page, workers)
+        try:
+            parser(html)  # 워커 프로세스 기동 시간은 제외
+            print(f"[parse] 파싱 프로세스 {workers}개: {run(parser):.0f} pages/s")
+        finally:
+            parser.close()
+        workers *= 2
+
+def synthetic_filter_rows(n, seed=0):
+    import random
+    rng = random.Random(seed)
+    return [
+        (i, rng.randrange(1, 8), rng.randrange(0, 64), 1 << rng.randrange(17), rng.randrange(0, 8),
+         None if rng.random() < 0.05 else rng.randrange(0, 300) * 1000)
+        for i in range(1, n + 1)
+    ]
+
+def bench_filter_index(n=100000, repeat=20):
+    import sqlite3
+    from filter_index import FilterIndex, build_filter_sql
+
+    rows = synthetic_filter_rows(n)
+    started = time.perf_counter()
+    index = FilterIndex(rows)
+    print(f"[filter_index] {n}행 적재 {time.perf_counter() - started:.3f}s")
+
+    db = sqlite3.connect(':memory:')
+    db.execute("CREATE TABLE filter (templestay_id INTEGER PRIMARY KEY, type INT, activity INT, region INT, etc INT, price INT)")
+    db.executemany("INSERT INTO filter VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    queries = [
+        dict(any_of={'type': 0b010}, sort='id'),
+        dict(any_of={'region': 0b1111}, all_of={'activity': 0b000101}, sort='price'),
+        dict(all_of={'etc': 0b001}, min_price=30000, max_price=80000, sort='-price', limit=50),
+    ]
+    for criteria in queries:
+        sql, params = build_filter_sql(placeholder='?', **criteria)
+        expected = [r[0] for r in db.execute(sql, params)]
+        assert list(index.query(**criteria)) == expected, f"결과 불일치: {criteria}"
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            db.execute(sql, params).fetchall()
+        sql_ms = (time.perf_counter() - started) / repeat * 1000
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            index.query(**criteria)
+        np_ms = (time.perf_counter() - started) / repeat * 1000
+        print(f"[filter_index] {criteria}: SQL {sql_ms:.2f}ms, NumPy {np_ms:.2f}ms ({len(expected)}건)")
+
+def synthetic_schedule_corpus(n=5000, seed=0):
+    import json
+    import random
+    rng = random.Random(seed)
+    phrases = ["입재 및 사찰 안내", "저녁 예불", "스님과의 차담", "새벽 예불", "새벽예불", "108배", "명상",
+               "참선", "공양", "울력", "포행", "염주 만들기", "연등 만들기", "자유 시간", "회향", "스님과 차담"]
+    corpus = []
+    for _ in range(n):
+        schedule = {}
+        for day in range(1, rng.randrange(2, 4)):
+            schedule[f"{day}일차"] = {f"{h:02d}:00": rng.choice(phrases) for h in sorted(rng.sample(range(4, 22), 8))}
+        corpus.append(json.dumps(schedule, ensure_ascii=False, separators=(',', ':')))
+    return corpus
+
+def load_schedule_corpus():
+    # 운영 DB의 templestay.schedule 전체 (db_config.yaml / JEOLLOGA_DB_CONFIG 설정 사용)
+    from db import close_pool, get_connection
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT schedule FROM templestay WHERE schedule IS NOT NULL")
+            return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+        close_pool()
+
+def bench_keyword_matcher(corpus=None, extra_keys=(0, 60)):
+    # corpus: templestay.schedule 목록 (없으면 합성 데이터)
+    from filter import ACTIVITY_ALIASES, ACTIVITY_MAP
+    from keyword_matcher import KeywordMatcher
+
+    corpus = corpus or synthetic_schedule_corpus()
+    for extra in extra_keys:
+        keyword_bits = dict(ACTIVITY_MAP)
+        keyword_bits.update({f"추가활동{i}": 1 << (6 + i) for i in range(extra)})
+        matcher = KeywordMatcher(keyword_bits, ACTIVITY_ALIASES)
+
+        # 기존 방식: 별칭까지 포함한 모든 표기를 하나씩 부분 문자열 검색
+        surfaces = list(matcher.bits.items())
+
+        def loop(text):
+            bit = 0
+            for surface, v in surfaces:
+                if surface in text:
+                    bit |= v
+            return bit
+
+        for text in corpus[:500]:
+            assert loop(text) == matcher.match_bits(text), "매처 결과 불일치"
+
+        started = time.perf_counter()
+        for text in corpus:
+            loop(text)
+        loop_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        for text in corpus:
+            matcher.match_bits(text)
+        matcher_ms = (time.perf_counter() - started) * 1000
+        print(f"[keyword] 키워드 {len(keyword_bits)}개(표기 {len(surfaces)}개), 일정 {len(corpus)}건: "
+              f"반복 검색 {loop_ms:.1f}ms, 매처 {matcher_ms:.1f}ms")
+
+def synthetic_etc_csv(path, n=100000, temples=5000, seed=0):
+    # 협력사 CSV와 같은 형식(cp949, temple_name/etc)의 합성 데이터
+    import random
+    import pandas as pd
+
+    rng = random.Random(seed)
+    tags = ['주차 가능', '1인실', '단체 가능', '와이파이', '']
+    names = [f"{rng.choice(['', ' '])}예시{i}사{rng.choice(['', ' ', '（본사）'])}" for i in range(temples)]
+    pd.DataFrame({
+        'temple_name': [rng.choice(names) for _ in range(n)],
+        'etc': [", ".join(rng.sample(tags, rng.randrange(0, 4))) for _ in range(n)],
+    }).to_csv(path, index=False, encoding='cp949')
+    return names
+
+def bench_etc(n=100000, temples=5000):
+    import tempfile
+    import pandas as pd
+    from etc import ETC_MAP, calculate_etc_bit, match_etc_bits, normalize, normalize_names
+
+    def legacy_calculate(df):
+        # 기존 groupby.apply 방식 (합 대신 OR로 바꿔 결과 비교)
+        df = df.copy()
+        df['temple_name'] = df['temple_name'].fillna('').apply(normalize)
+        df['etc'] = df['etc'].fillna('')
+
+        def reduce_bits(items):
+            bit = 0
+            for line in items:
+                for tag in line.split(','):
+                    bit |= ETC_MAP.get(tag.strip(), 0)
+            return bit
+        return df.groupby('temple_name')['etc'].apply(reduce_bits).reset_index(name='etc_bit')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'etc.csv')
+        names = synthetic_etc_csv(path, n, temples)
+        df = pd.read_csv(path, encoding='cp949')
+
+    started = time.perf_counter()
+    legacy = legacy_calculate(df)
+    legacy_s = time.perf_counter() - started
+    started = time.perf_counter()
+    vectorized = calculate_etc_bit(df)
+    vector_s = time.perf_counter() - started
+    assert legacy['temple_name'].tolist() == vectorized['temple_name'].tolist()
+    assert legacy['etc_bit'].tolist() == vectorized['etc_bit'].tolist()
+    print(f"[etc] {n}행 비트 계산: groupby.apply {legacy_s * 1000:.0f}ms, 벡터화 {vector_s * 1000:.0f}ms "
+          f"(x{legacy_s / vector_s:.1f})")
+
+    # DB temple_name 목록과 연결: iterrows + dict 조회 vs DataFrame merge
+    db_names = pd.DataFrame({'templestay_id': range(1, len(names) * 2 + 1), 'temple_name': names * 2})
+    db_names['temple_name'] = normalize_names(db_names['temple_name'])
+    name_to_ids = {}
+    for tid, name in zip(db_names['templestay_id'], db_names['temple_name']):
+        name_to_ids.setdefault(name, []).append(tid)
+
+    started = time.perf_counter()
+    pairs = []
+    for _, row in vectorized.iterrows():
+        for tid in name_to_ids.get(row['temple_name'], []):
+            pairs.append((tid, row['etc_bit']))
+    loop_s = time.perf_counter() - started
+    started = time.perf_counter()
+    merged = match_etc_bits(vectorized, db_names)
+    merge_s = time.perf_counter() - started
+    assert sorted(pairs) == sorted(merged)
+    print(f"[etc] {len(merged)}건 연결: iterrows {loop_s * 1000:.0f}ms, merge {merge_s * 1000:.0f}ms "
+          f"(x{loop_s / merge_s:.1f})")
+
+def bench_etc_stream(n=300000, chunksize=50000):
+    # 전체 read_csv 대비 청크 읽기의 최대 메모리, CSV 디코드 대비 Parquet 캐시 읽기 시간
+    import tempfile
+    import pandas as pd
+    from etc import EtcAccumulator, calculate_etc_bit, iter_etc_chunks
+
+    def peak(fn):
+        # 시간은 tracemalloc 없이 따로 재고, 메모리는 한 번 더 실행해 최대 추적량(MB)으로
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        try:
+            fn()
+            return result, elapsed, tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    def stream(path, cache_dir=None):
+        accumulator = EtcAccumulator()
+        for chunk in iter_etc_chunks(path, chunksize, cache_dir):
+            accumulator.add(chunk)
+        return accumulator.bits
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'etc.csv')
+        synthetic_etc_csv(path, n)
+        cache_dir = os.path.join(tmp, 'cache')
+
+        full, full_s, full_mb = peak(lambda: calculate_etc_bit(pd.read_csv(path, encoding='cp949')))
+        streamed, stream_s, stream_mb = peak(lambda: stream(path))
+        assert streamed == dict(zip(full['temple_name'], full['etc_bit']))
+        stream(path, cache_dir)
+        _, cached_s, _ = peak(lambda: stream(path, cache_dir))
+
+    print(f"[etc] {n}행 전체 읽기 {full_s:.2f}s/최대 {full_mb:.0f}MB, "
+          f"청크 {chunksize}행 {stream_s:.2f}s/최대 {stream_mb:.0f}MB, Parquet 캐시 {cached_s:.2f}s")
+
+def synthetic_temple_names(n=5000, queries=3000, unknown=500, seed=0):
+    """DB 사찰명 n개와, 그것을 변형한 CSV 표기(정답 포함) + DB에 없는 이름 unknown개.
+    변형: 그대로, '사' 생략, 한자 병기, 분원 표기, 받침 오타 한 글자"""
+    import random
+    rng = random.Random(seed)
+    syllables = [chr(0xAC00 + rng.randrange(11172)) for _ in range(300)]
+    hanja = [chr(0x4E00 + rng.randrange(20000)) for _ in range(200)]
+
+    def new_name():
+        return ''.join(rng.choice(syllables) for _ in range(rng.choice([2, 2, 3]))) + '사'
+
+    def typo(name):
+        i = rng.randrange(len(name) - 1)
+        code = ord(name[i]) - 0xAC00
+        jong = (code % 28 + rng.randrange(1, 28)) % 28
+        return name[:i] + chr(0xAC00 + code - code % 28 + jong) + name[i + 1:]
+
+    names = set()
+    while len(names) < n + unknown:
+        names.add(new_name())
+    names = sorted(names)
+    rng.shuffle(names)
+    db_names, unknown_names = names[:n], names[n:]
+
+    variants = [
+        lambda name: name,
+        lambda name: name[:-1],
+        lambda name: f"{name}({''.join(rng.choice(hanja) for _ in range(len(name)))})",
+        lambda name: name + rng.choice(['서울분원', '부산지부', '포교당']),
+        typo,
+    ]
+    cases = []
+    for _ in range(queries):
+        i = rng.randrange(n)
+        cases.append((rng.choice(variants)(db_names[i]), db_names[i]))
+    cases += [(name, None) for name in unknown_names]
+    rng.shuffle(cases)
+    return db_names, cases
+
+def bench_name_matcher(n=5000, queries=3000, unknown=500, brute_queries=200):
+    # 정확 일치 대비 재현율, 채택한 매칭의 정밀도, 전수 비교 대비 조회 속도
+    from etc import normalize
+    from name_matcher import NameMatcher, jamo_ngrams, canonical_name
+
+    db_names, cases = synthetic_temple_names(n, queries, unknown)
+    matcher = NameMatcher({name: [i] for i, name in enumerate(db_names)})
+    exact = set(db_names)
+
+    started = time.perf_counter()
+    results = [matcher.match(normalize(query)) for query, _ in cases]
+    index_s = time.perf_counter() - started
+
+    known = sum(1 for _, answer in cases if answer)
+    exact_hits = sum(1 for query, answer in cases if answer and normalize(query) in exact)
+    accepted = correct = ambiguous = false_accepts = 0
+    for (_, answer), (status, db_name, _, _) in zip(cases, results):
+        if status == 'ambiguous':
+            ambiguous += 1
+        elif status != 'unmatched':
+            accepted += 1
+            correct += db_name == answer
+            false_accepts += answer is None
+    print(f"[name] DB {n}개, 질의 {len(cases)}개(DB에 없는 이름 {unknown}개): "
+          f"재현율 정확 일치 {exact_hits / known:.1%} → 유사 매칭 {correct / known:.1%}, "
+          f"정밀도 {correct / accepted:.1%}, 모호 {ambiguous}개, 없는 이름 오매칭 {false_accepts}개")
+
+    # 전수 비교: 모든 DB 이름과 같은 Dice 점수를 계산 (O(N×M))
+    grams = [jamo_ngrams(canonical_name(name), matcher.n) for name in db_names]
+
+    def brute(query):
+        q = jamo_ngrams(canonical_name(query), matcher.n)
+        return max(range(len(grams)), key=lambda i: 2 * len(q & grams[i]) / (len(q) + len(grams[i])))
+
+    sample = [normalize(query) for query, _ in cases[:brute_queries]]
+    started = time.perf_counter()
+    for query in sample:
+        brute(query)
+    brute_s = (time.perf_counter() - started) / len(sample) * len(cases)
+    print(f"[name] 조회 {len(cases)}건: 전수 비교 {brute_s:.2f}s(추정), 역색인 {index_s:.2f}s "
+          f"({len(cases) / index_s:.0f}건/s, x{brute_s / index_s:.0f})")
+
+BENCH_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS templestay (
+        id INT AUTO_INCREMENT PRIMARY KEY, url VARCHAR(512) NOT NULL UNIQUE,
+        templestay_name VARCHAR(255), temple_name VARCHAR(255), address VARCHAR(255), phone VARCHAR(50),
+        introduction TEXT, schedule TEXT, content_hash CHAR(64), updated_at DATETIME
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS filter (
+        templestay_id INT PRIMARY KEY, type INT, activity INT, region INT, etc INT, price INT, content_hash CHAR(64)
+    )""",
+    """CREATE TABLE IF NOT EXISTS image (
+        id INT AUTO_INCREMENT PRIMARY KEY, templestay_id INT NOT NULL, img_url VARCHAR(512) NOT NULL, created_at DATETIME
+    ) DEFAULT CHARSET=utf8mb4""",
+]
+
+def bench_bulk_write(db_config, n=5000):
+    # 벤치 전용 스키마(로컬 MySQL/MariaDB 컨테이너)에 대해 executemany와 임시 테이블 방식 비교
+    import mysql.connector
+    from bulk import bulk_insert_urls, bulk_update_templestay
+
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor()
+    for ddl in BENCH_SCHEMA:
+        cursor.execute(ddl)
+    for table in ("image", "filter", "templestay"):
+        cursor.execute(f"DELETE FROM {table}")
+    conn.commit()
+
+    urls = [(f"https://bench.local/reserve?seq={i}", 1 << (i % 3)) for i in range(n)]
+    started = time.perf_counter()
+    bulk_insert_urls(conn, urls)
+    print(f"[bulk] URL {n}건 등록(임시 테이블): {n / (time.perf_counter() - started):.0f} rows/s")
+
+    cursor.execute("SELECT id FROM templestay ORDER BY id")
+    ids = [row[0] for row in cursor.fetchall()]
+    records = [(f"이름{i}", "예시사", "경상북도 예시군", "054-000-0000", "소개 " * 50, "{}", None, tid)
+               for i, tid in enumerate(ids)]
+
+    started = time.perf_counter()
+    for i in range(0, len(records), 100):
+        cursor.executemany("""
+            UPDATE templestay SET templestay_name = %s, temple_name = %s, address = %s, phone = %s,
+                introduction = %s, schedule = %s, content_hash = %s, updated_at = NOW()
+            WHERE id = %s
+        """, records[i:i + 100])
+        conn.commit()
+    print(f"[bulk] templestay {n}건 executemany: {n / (time.perf_counter() - started):.0f} rows/s")
+
+    started = time.perf_counter()
+    bulk_update_templestay(conn, records)
+    print(f"[bulk] templestay {n}건 임시 테이블 + UPDATE JOIN: {n / (time.perf_counter() - started):.0f} rows/s")
+
+    cursor.close()
+    conn.close()
+
+def bench_image_store(n=40, size=(1600, 1200)):
+    import random
+    import tempfile
+    from PIL import Image
+    from fetcher import create_session
+    from image_store import ImageStore, fetch_and_thumbnail
+    from stub_server import run_static_server
+    from throttle import AdaptiveRateLimiter, PoliteSession
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = os.path.join(tmp, "src")
+        os.makedirs(src_dir)
+        rng = random.Random(0)
+        for i in range(n):
+            color = tuple(rng.randrange(256) for _ in range(3))
+            Image.new("RGB", size, color).save(os.path.join(src_dir, f"{i}.jpg"), quality=90)
+
+        store = ImageStore(os.path.join(tmp, "store"))
+        session = PoliteSession(create_session(), AdaptiveRateLimiter(initial_rate=500.0, max_rate=500.0))
+        with run_static_server(src_dir) as server:
+            urls = [f"{server.base_url}/{i}.jpg" for i in range(n)]
+            started = time.perf_counter()
+            first = fetch_and_thumbnail(urls, store, session)
+            cold = time.perf_counter() - started
+            started = time.perf_counter()
+            second = fetch_and_thumbnail(urls, store, session)
+            warm = time.perf_counter() - started
+
+        assert len(first) == len(second) == n
+        assert first == second
+        print(f"[image] {n}장 다운로드+썸네일: {cold:.2f}s, 조건부 GET 재실행: {warm:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="파서/파이프라인 벤치마크")
+    parser.add_argument("--save-baseline", action="store_true", help="추적 지표를 기준값 파일로 저장")
+    parser.add_argument("--check", action="store_true", help="기준값 대비 회귀가 있으면 종료 코드 1")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="허용 회귀 비율 (기본 0.25)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 파일 (같은 머신에서 만든 값과 비교)")
+    parser.add_argument("--keyword-db", action="store_true",
+                        help="키워드 매처를 합성 데이터 대신 DB의 templestay.schedule로 측정")
+    args = parser.parse_args()
+
+    if args.keyword_db:
+        corpus = load_schedule_corpus()
+        print(f"[keyword] DB에서 일정 {len(corpus)}건 불러옴")
+        bench_keyword_matcher(corpus)
+        sys.exit(0)
+
+    if args.save_baseline or args.check:
+        current = run_tracked()
+        if args.save_baseline:
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump(current, f, ensure_ascii=False, indent=2, sort_keys=True)
+            print(f"기준값 {len(current)}개 저장: {args.baseline}")
+        if args.check:
+            if not os.path.exists(args.baseline):
+                print(f"기준값 파일이 없습니다. --save-baseline으로 먼저 만드세요: {args.baseline}")
+                sys.exit(1)
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressions = check_regressions(current, baseline, args.threshold)
+            for key, base, value, change in regressions:
+                print(f"[회귀] {key}: {base:.1f} → {value:.1f} ({change:+.0%})")
+            if regressions:
+                sys.exit(1)
+            print(f"회귀 없음 (지표 {len(baseline)}개, 허용 {args.threshold:.0%})")
+        sys.exit(0)
+
+    if os.environ.get("BENCH_DB_CONFIG"):
+        import yaml
+        with open(os.environ["BENCH_DB_CONFIG"], encoding="utf-8") as f:
+            bench_bulk_write(yaml.safe_load(f)["database"])
+    bench_etc()
+    bench_etc_stream()
+    bench_name_matcher()
+    bench_image_store()
+    bench_keyword_matcher()
+    bench_detail_parse()
+    bench_parse_pool()
+    bench_parsers()
+    bench_pipeline()
+    bench_listing()
@@ -0,0 +1,209 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_STAGE_ROWS = 1000
+MAX_STAGE_BYTES = 4 * 1024 * 1024
+
+class BulkStats:
+    """작업별 누적 행 수와 소요 시간, 커밋 단위(청크) 수와 가장 느린 청크 시간"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {}
+
+    def record(self, name, rows, elapsed):
+        with self._lock:
+            total_rows, total_elapsed, chunks, slowest = self.totals.get(name, (0, 0.0, 0, 0.0))
+            self.totals[name] = (total_rows + rows, total_elapsed + elapsed, chunks + 1, max(slowest, elapsed))
+
+    def summary(self):
+        with self._lock:
+            return {
+                name: f"{rows}행, {rows / elapsed if elapsed else 0:.0f} rows/s, 청크 {chunks}개 (최대 {slowest:.3f}s)"
+                for name, (rows, elapsed, chunks, slowest) in self.totals.items()
+            }
+
+bulk_stats = BulkStats()
+
+def _estimate_size(row):
+    # 패킷 크기 기준이므로 문자열은 UTF-8 바이트 수로 센다 (한글은 글자당 3바이트)
+    return sum(
+        len(v.encode('utf-8')) if isinstance(v, str) else len(v) if isinstance(v, bytes) else 8
+        for v in row
+    )
+
+def _chunks(rows, max_rows=MAX_STAGE_ROWS, max_bytes=MAX_STAGE_BYTES):
+    # max_allowed_packet을 넘지 않도록 행 수와 대략적인 바이트 수로 나눈다
+    chunk, size = [], 0
+    for row in rows:
+        row_size = _estimate_size(row)
+        if chunk and (len(chunk) >= max_rows or size + row_size > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+def create_stage(cursor, stage, source_sql):
+    # 원본 테이블과 같은 컬럼 타입의 임시 테이블 (임시 테이블은 암묵적 커밋을 일으키지 않음)
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+    cursor.execute(f"CREATE TEMPORARY TABLE {stage} AS {source_sql} LIMIT 0")
+
+def drop_stage(cursor, stage):
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+
+def stage_rows(cursor, stage, columns, rows):
+    # 여러 행을 INSERT 한 문장으로 보낸다
+    row_sql = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    for chunk in _chunks(rows):
+        params = [value for row in chunk for value in row]
+        cursor.execute(
+            f"INSERT INTO {stage} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))}",
+            params,
+        )
+
+def _tsv_value(value):
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def stage_rows_infile(cursor, stage, columns, rows):
+    # LOAD DATA LOCAL INFILE 사용 (연결에 allow_local_infile=True 필요)
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for row in rows:
+                f.write("\t".join(_tsv_value(v) for v in row) + "\n")
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {stage} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+            (path.replace("\\", "/"),),
+        )
+    finally:
+        os.remove(path)
+
+def _run_bulk(conn, name, rows, stage, source_sql, columns, merge_sqls, use_infile=False, chunk_rows=None,
+              commit=True):
+    # chunk_rows를 주면 그 행 수마다 따로 스테이징/반영/커밋해 한 트랜잭션이 잡는 락 시간을 제한한다
+    # commit=False면 커밋/롤백을 호출 측 트랜잭션에 맡긴다 (청크로 나누지 않음)
+    if not rows:
+        return 0
+    if not commit or not chunk_rows or len(rows) <= chunk_rows:
+        return _run_chunk(conn, name, rows, stage, source_sql, columns, merge_sqls, use_infile, commit=commit)
+
+    total = (len(rows) + chunk_rows - 1) // chunk_rows
+    affected = 0
+    for i in range(total):
+        chunk = rows[i * chunk_rows:(i + 1) * chunk_rows]
+        affected += _run_chunk(conn, name, chunk, stage, source_sql, columns, merge_sqls, use_infile,
+                               label=f" [청크 {i + 1}/{total}]")
+    return affected
+
+def _run_chunk(conn, name, rows, stage, source_sql, columns, merge_sqls, use_infile=False, label="",
+               commit=True):
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        create_stage(cursor, stage, source_sql)
+        if use_infile:
+            stage_rows_infile(cursor, stage, columns, rows)
+        else:
+            stage_rows(cursor, stage, columns, rows)
+
+        affected = 0
+        for sql in merge_sqls:
+            cursor.execute(sql)
+            affected = cursor.rowcount
+        drop_stage(cursor, stage)
+        if commit:
+            conn.commit()
+    except Exception:
+        if commit:
+            conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - started
+    bulk_stats.record(name, len(rows), elapsed)
+    metrics.observe('db_write', elapsed)
+    metrics.inc('rows_written', len(rows))
+    logger.info(f"{name}{label}: {len(rows)}행 {elapsed:.3f}s ({len(rows) / elapsed if elapsed else 0:.0f} rows/s)")
+    return affected
+
+def bulk_update(conn, table, key, columns, rows, name=None, extra_set=None, use_infile=False,
+                chunk_rows=None, merge=None):
+    # rows: columns 순서의 값 + 마지막에 key 값. 임시 테이블에 넣고 UPDATE ... JOIN 한 문장으로 반영
+    # merge: {컬럼: 'replace' | 'or'}. 'or'이면 기존 비트를 유지한 채 새 비트만 더한다
+    stage = f"stage_{table}"
+    merge = merge or {}
+    assignments = ", ".join(
+        f"t.{c} = COALESCE(t.{c}, 0) | s.{c}" if merge.get(c) == 'or' else f"t.{c} = s.{c}"
+        for c in columns
+    )
+    if extra_set:
+        assignments += ", " + extra_set
+    all_columns = tuple(columns) + (key,)
+    return _run_bulk(
+        conn, name or f"{table} 업데이트", list(rows), stage,
+        f"SELECT {', '.join(all_columns)} FROM {table}",
+        all_columns,
+        [f"UPDATE {table} t JOIN {stage} s ON t.{key} = s.{key} SET {assignments}"],
+        use_infile,
+        chunk_rows,
+    )
+
+def bulk_update_bits(conn, table, key, column, pairs, mode='replace', chunk_rows=MAX_STAGE_ROWS, name=None):
+    """(key, bitmask) 목록을 chunk_rows개씩 파라미터로 보내 반영. 청크마다 커밋하고 소요 시간을 기록"""
+    rows = [(bits, key_value) for key_value, bits in pairs]
+    return bulk_update(
+        conn, table, key, (column,), rows,
+        name=name or f"{table}.{column} 비트 업데이트", chunk_rows=chunk_rows, merge={column: mode},
+    )
+
+TEMPLESTAY_COLUMNS = ("templestay_name", "temple_name", "address", "phone", "introduction", "schedule", "content_hash")
+
+def bulk_update_templestay(conn, records, use_infile=False):
+    # records: (templestay_name, temple_name, address, phone, introduction, schedule, content_hash, id)
+    return bulk_update(
+        conn, "templestay", "id", TEMPLESTAY_COLUMNS, records,
+        name="templestay 업데이트", extra_set="t.updated_at = NOW()", use_infile=use_infile,
+    )
+
+def bulk_insert_images(conn, rows, use_infile=False, commit=True):
+    # rows: (templestay_id, img_url)
+    return _run_bulk(
+        conn, "이미지 삽입", rows, "stage_image",
+        "SELECT templestay_id, img_url FROM image",
+        ("templestay_id", "img_url"),
+        ["INSERT INTO image (templestay_id, img_url, created_at) SELECT templestay_id, img_url, NOW() FROM stage_image"],
+        use_infile,
+        commit=commit,
+    )
+
+def bulk_insert_urls(conn, rows, use_infile=False, chunk_rows=None):
+    # rows: (url, type_bits). 생성된 id는 서버에서 JOIN으로 바로 filter에 넣으므로 다시 조회하지 않는다
+    return _run_bulk(
+        conn, "URL 등록", rows, "stage_url",
+        "SELECT t.url, f.type FROM templestay t JOIN filter f ON t.id = f.templestay_id",
+        ("url", "type"),
+        [
+            "INSERT IGNORE INTO templestay (url) SELECT url FROM stage_url",
+            """
+            INSERT INTO filter (templestay_id, type)
+            SELECT t.id, s.type FROM stage_url s JOIN templestay t ON t.url = s.url
+            ON DUPLICATE KEY UPDATE type = VALUES(type)
+            """,
+        ],
+        use_infile,
+        chunk_rows,
+    )
@@ -0,0 +1,136 @@
+import sqlite3
+import threading
+import time
+
+CRAWL_STATE_PATH = 'crawl_state.sqlite'
+
+class CrawlJournal:
+    """URL별 크롤링 상태(성공/실패, 시도 횟수, 마지막 오류)를 SQLite에 즉시 기록하는 저널"""
+
+    def __init__(self, path=CRAWL_STATE_PATH, max_attempts=3):
+        self.max_attempts = max_attempts
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS url_state (
+                templestay_id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                last_success REAL,
+                last_run INTEGER,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def begin_run(self):
+        # 마지막 실행이 끝나지 않았으면 그 실행을 이어서 진행
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, finished_at FROM runs ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            if row and row[1] is None:
+                self.run_id = row[0]
+                return self.run_id, True
+            cur = self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+            self.run_id = cur.lastrowid
+            return self.run_id, False
+
+    def finish_run(self):
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id))
+
+    def select_work(self, url_data):
+        with self._lock:
+            states = {
+                row[0]: row[1:]
+                for row in self._conn.execute("SELECT templestay_id, status, attempts, last_run FROM url_state")
+            }
+
+        work = []
+        for row in url_data:
+            state = states.get(row[0])
+            if state:
+                status, attempts, last_run = state
+                if last_run == self.run_id and status in ('done', 'unchanged'):
+                    continue
+                if status == 'failed' and attempts >= self.max_attempts:
+                    continue
+            work.append(row)
+        return work
+
+    def record_success(self, templestay_id, url, status='done'):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO url_state (templestay_id, url, status, attempts, last_error, last_success, last_run, updated_at)
+                VALUES (?, ?, ?, 0, NULL, ?, ?, ?)
+                ON CONFLICT(templestay_id) DO UPDATE SET
+                    url = excluded.url, status = excluded.status, attempts = 0, last_error = NULL,
+                    last_success = excluded.last_success, last_run = excluded.last_run, updated_at = excluded.updated_at
+            """, (templestay_id, url, status, now, self.run_id, now))
+
+    def record_successes(self, rows, status='done'):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("""
+                UPDATE url_state
+                SET status = ?, attempts = 0, last_error = NULL, last_success = ?, last_run = ?, updated_at = ?
+                WHERE templestay_id = ?
+            """, [(status, now, self.run_id, now, templestay_id) for templestay_id in rows])
+
+    def record_pending(self, templestay_id, url):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO url_state (templestay_id, url, status, last_run, updated_at)
+                VALUES (?, ?, 'pending', ?, ?)
+                ON CONFLICT(templestay_id) DO UPDATE SET
+                    url = excluded.url, status = 'pending', last_run = excluded.last_run, updated_at = excluded.updated_at
+            """, (templestay_id, url, self.run_id, now))
+
+    def record_failure(self, templestay_id, url, error):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO url_state (templestay_id, url, status, attempts, last_error, last_run, updated_at)
+                VALUES (?, ?, 'failed', 1, ?, ?, ?)
+                ON CONFLICT(templestay_id) DO UPDATE SET
+                    url = excluded.url, status = 'failed', attempts = url_state.attempts + 1,
+                    last_error = excluded.last_error, last_run = excluded.last_run, updated_at = excluded.updated_at
+            """, (templestay_id, url, str(error)[:500], self.run_id, now))
+
+    def record_failures(self, templestay_ids, error):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("""
+                UPDATE url_state
+                SET status = 'failed', attempts = attempts + 1, last_error = ?, last_run = ?, updated_at = ?
+                WHERE templestay_id = ?
+            """, [(str(error)[:500], self.run_id, now, templestay_id) for templestay_id in templestay_ids])
+
+    def summary(self):
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM url_state WHERE last_run = ? GROUP BY status", (self.run_id,)
+            ).fetchall())
+            exhausted = self._conn.execute(
+                "SELECT COUNT(*) FROM url_state WHERE status = 'failed' AND attempts >= ?", (self.max_attempts,)
+            ).fetchone()[0]
+        counts['retry_exhausted'] = exhausted
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
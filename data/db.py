@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+
+import mysql.connector
+import yaml
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# JEOLLOGA_DB_CONFIG > data/db_config.yaml > 기존 윈도우 경로 순서로 찾는다
+LEGACY_CONFIG_PATH = "C:\\jeolloga-crawling\\data\\db_config.yaml"
+LOCAL_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_config.yaml")
+
+DEFAULT_POOL_SIZE = 8
+ACQUIRE_TIMEOUT = 30.0
+PING_AFTER = 30.0
+STATEMENT_CACHE_SIZE = 32
+
+def resolve_config_path(path=None):
+    candidates = [path, os.environ.get("JEOLLOGA_DB_CONFIG"), LOCAL_CONFIG_PATH, LEGACY_CONFIG_PATH]
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"DB 설정 파일을 찾을 수 없습니다: {[c for c in candidates if c]}")
+
+def load_db_config(path=None):
+    with open(resolve_config_path(path), "r", encoding="utf-8") as file:
+        return yaml.safe_load(file).get("database")
+
+class TimedCursor:
+    """execute/executemany 소요 시간을 db_query로 기록하는 커서 래퍼"""
+
+    def __init__(self, cursor, pool):
+        self._cursor = cursor
+        self._pool = pool
+
+    def execute(self, operation, params=None):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params)
+        finally:
+            self._pool.record_query(time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params)
+        finally:
+            self._pool.record_query(time.perf_counter() - started)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class PooledConnection:
+    """풀에서 빌린 연결. close()하면 실제로 닫지 않고 풀에 반납한다"""
+
+    def __init__(self, raw, pool):
+        self.raw = raw
+        self.pool = pool
+        self.last_used = time.monotonic()
+        self._statements = OrderedDict()
+        self._checked_out = False
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self.raw.cursor(*args, **kwargs), self.pool)
+
+    def prepared(self, sql):
+        # SQL별 서버 측 prepared statement를 연결마다 캐시 (같은 SQL이면 다시 PREPARE하지 않음)
+        cursor = self._statements.get(sql)
+        if cursor is None:
+            cursor = self.raw.cursor(prepared=True)
+            self._statements[sql] = cursor
+            if len(self._statements) > STATEMENT_CACHE_SIZE:
+                _, evicted = self._statements.popitem(last=False)
+                evicted.close()
+        else:
+            self._statements.move_to_end(sql)
+        return TimedCursor(cursor, self.pool)
+
+    def clear_statements(self):
+        for cursor in self._statements.values():
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        self._statements.clear()
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if self._checked_out:
+            self.pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+class ConnectionPool:
+    """모든 스크립트가 함께 쓰는 크기 제한 연결 풀.
+    빈 연결이 없으면 새로 만들지 않고 반납을 기다리며, 오래 쉰 연결은 ping으로 확인 후 재사용"""
+
+    def __init__(self, config, size=DEFAULT_POOL_SIZE, acquire_timeout=ACQUIRE_TIMEOUT, ping_after=PING_AFTER,
+                 connect=None):
+        # connect: 연결 생성 함수 (기본 mysql.connector.connect, 벤치마크에서는 SQLite 대용 연결)
+        self.config = dict(config)
+        self.connect = connect or mysql.connector.connect
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.ping_after = ping_after
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self.stats = {'acquired': 0, 'opened': 0, 'reconnected': 0, 'wait': 0.0, 'queries': 0, 'query_time': 0.0}
+
+    def _connect(self):
+        # 호출 전에 _created 자리를 잡아 두고, 실패하면 되돌린다
+        try:
+            raw = self.connect(**self.config)
+            raw.autocommit = False
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        self._count('opened')
+        return PooledConnection(raw, self)
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def record_query(self, elapsed):
+        with self._lock:
+            self.stats['queries'] += 1
+            self.stats['query_time'] += elapsed
+        metrics.observe('db_query', elapsed)
+
+    def _healthy(self, conn):
+        if time.monotonic() - conn.last_used < self.ping_after:
+            return True
+        try:
+            conn.raw.ping(reconnect=True, attempts=1)
+            # 재연결되었다면 예전 prepared statement는 무효
+            conn.clear_statements()
+            return True
+        except Exception as e:
+            logger.warning(f"유휴 연결 확인 실패, 새로 연결: {e}")
+            return False
+
+    def acquire(self, timeout=None):
+        started = time.perf_counter()
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                conn = self._connect()
+            else:
+                try:
+                    conn = self._idle.get(timeout=timeout or self.acquire_timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"DB 연결 대기 시간 초과 (풀 크기 {self.size})")
+
+        if not self._healthy(conn):
+            self._discard(conn)
+            with self._lock:
+                self._created += 1
+            conn = self._connect()
+            self._count('reconnected')
+
+        wait = time.perf_counter() - started
+        self._count('acquired')
+        self._count('wait', wait)
+        metrics.observe('db_pool_wait', wait)
+        conn._checked_out = True
+        return conn
+
+    def release(self, conn):
+        conn._checked_out = False
+        try:
+            # 커밋하지 않은 작업은 다음 사용자에게 넘기지 않는다
+            if conn.raw.in_transaction:
+                conn.raw.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        conn.last_used = time.monotonic()
+        self._idle.put(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self._created -= 1
+        conn.clear_statements()
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def summary(self):
+        with self._lock:
+            s = dict(self.stats)
+        return (f"연결 생성 {s['opened']}회, 재연결 {s['reconnected']}회, 대여 {s['acquired']}회 "
+                f"(평균 대기 {s['wait'] / s['acquired'] * 1000 if s['acquired'] else 0:.1f}ms), "
+                f"쿼리 {s['queries']}회 (평균 {s['query_time'] / s['queries'] * 1000 if s['queries'] else 0:.1f}ms)")
+
+class AsyncConnectionPool:
+    """asyncio 크롤러용 래퍼. 연결 대여와 DB 작업을 스레드에서 실행해 이벤트 루프를 막지 않는다"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def acquire(self):
+        return AsyncConnection(await asyncio.to_thread(self.pool.acquire))
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+    async def run(self, fn, *args, **kwargs):
+        # fn(conn, *args)를 풀 연결로 실행
+        async with self.connection() as conn:
+            return await conn.run(fn, *args, **kwargs)
+
+class AsyncConnection:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def run(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.conn, *args, **kwargs)
+
+    async def close(self):
+        await asyncio.to_thread(self.conn.close)
+
+    async def execute(self, sql, params=None, fetch=False):
+        def execute(conn):
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall() if fetch else cursor.rowcount
+            conn.commit()
+            return rows
+        return await self.run(execute)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def init_pool(size=DEFAULT_POOL_SIZE, config=None, config_path=None, connect=None):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(config if config is not None else load_db_config(config_path), size, connect=connect)
+        logger.info(f"데이터베이스 연결 풀 생성 (크기 {size})")
+        return _pool
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(load_db_config(), DEFAULT_POOL_SIZE)
+        return _pool
+
+def get_async_pool():
+    return AsyncConnectionPool(get_pool())
+
+def get_connection():
+    return get_pool().acquire()
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            logger.info(f"DB 연결 풀 통계 - {_pool.summary()}")
+            _pool.close()
+            _pool = None
@@ -0,0 +1,306 @@
+import json
+import re
+
+from collections import OrderedDict
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+from fingerprint import detail_fingerprint, fingerprint
+from image_sync import normalize_image_url
+
+PHONE_RE = re.compile(r'\d{2,3}[-\s]?\d{3,4}[-\s]?\d{4}')
+
+_SKIP_TEXT_TAGS = {'script', 'style', 'template'}
+
+EMPTY_DETAILS = (None, None, None, None, None, None, [], None)
+
+# known_hash와 같을 때 parse_detail_page가 돌려주는 값 (프로세스 풀을 거쳐도 비교되도록 문자열)
+UNCHANGED = 'unchanged'
+
+@lru_cache(maxsize=100)
+def extract_phone_number(phone_text):
+    phone_pattern = re.compile(r'[\d\- /]+')
+    match = phone_pattern.search(phone_text)
+    if not match:
+        return None
+    phone = match.group().strip()
+    if '/' in phone:
+        phone = phone.split('/')[-1].strip()
+    return phone
+
+def split_address(text_value):
+    parts = [p.strip() for p in text_value.split(',', 1)]
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return None, text_value
+
+def clean_paragraph(text):
+    return '\n'.join([line.strip() for line in text.splitlines() if line.strip()])
+
+def schedule_json(rows):
+    # rows: 헤더를 제외한 각 tr의 td 텍스트 목록
+    schedule_dict = OrderedDict()
+    current_day = None
+
+    for cols in rows:
+        if len(cols) == 3:
+            day_cell, time_cell, activity_cell = cols
+
+            if day_cell:
+                current_day = day_cell.replace(" ", "")
+                if current_day not in schedule_dict:
+                    schedule_dict[current_day] = OrderedDict()
+
+            if current_day:
+                schedule_dict[current_day][time_cell] = activity_cell
+
+        elif len(cols) == 2 and current_day:
+            time_cell, activity_cell = cols
+            schedule_dict[current_day][time_cell] = activity_cell
+
+    return json.dumps(schedule_dict, ensure_ascii=False, separators=(',', ':'))
+
+# --- lxml 기반 단일 패스 추출 ---
+
+def _classes(el):
+    return (el.get('class') or '').split()
+
+def _iter_text(el):
+    # BeautifulSoup.get_text()와 같게 주석과 script/style 내용은 제외
+    if el.text and el.tag not in _SKIP_TEXT_TAGS:
+        yield el.text
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT_TAGS:
+            yield from _iter_text(child)
+        if child.tail:
+            yield child.tail
+
+def _text(el, strip=False):
+    if strip:
+        return ''.join(s.strip() for s in _iter_text(el))
+    return ''.join(_iter_text(el))
+
+def _find(el, tag, cls=None):
+    for child in el.iterdescendants(tag):
+        if cls is None or cls in _classes(child):
+            return child
+    return None
+
+def _table_rows(table):
+    rows = list(table.iterdescendants('tr'))[1:]
+    return [[_text(td, strip=True) for td in row.iterdescendants('td')] for row in rows]
+
+def _info_fields(place_div):
+    temple_name = None
+    address = None
+    phone = None
+
+    info_div = _find(place_div, 'div', 'info')
+    if info_div is None:
+        return temple_name, address, phone
+
+    for li in info_div.iterdescendants('li'):
+        img = _find(li, 'img')
+        text_label = img.get('alt', '') if img is not None else ''
+        text_nodes = [li.text] + [child.tail for child in li]
+        text_value = ''.join(t.strip() for t in text_nodes if t and t.strip())
+
+        if '주소' in text_label:
+            temple_name, address = split_address(text_value)
+        elif '연락처' in text_label or PHONE_RE.search(text_value):
+            phone = extract_phone_number(text_value) or phone
+
+    return temple_name, address, phone
+
+def _intro_text(sections, intro_imgs):
+    program_sections = []
+    for section in sections:
+        h4 = _find(section, 'h4')
+        if h4 is not None and '프로그램 소개' in _text(h4):
+            txt_div = _find(section, 'div', 'txt')
+            if txt_div is not None and _find(txt_div, 'p') is not None:
+                program_sections.append(txt_div)
+
+    if not program_sections:
+        for img in intro_imgs:
+            for div in reversed(list(img.iterancestors('div'))):
+                txt_div = _find(div.getparent(), 'div', 'txt')
+                if txt_div is not None and _find(txt_div, 'p') is not None \
+                        and all(txt_div is not s for s in program_sections):
+                    program_sections.append(txt_div)
+
+    all_text = [clean_paragraph(_text(p)) for section in program_sections for p in section.iterdescendants('p')]
+    return '\n\n'.join(all_text) if all_text else None
+
+def _schedule(sections):
+    for section in sections:
+        h4 = _find(section, 'h4')
+        if h4 is not None and '프로그램 일정' in _text(h4):
+            schedule_div = _find(section, 'div', 'table')
+            table = _find(schedule_div, 'table') if schedule_div is not None else None
+            return schedule_json(_table_rows(table)) if table is not None else None
+    return None
+
+def _image_urls(slides, prg_srcs):
+    # 정규화한 URL을 순서를 유지한 채 중복 제거 (dict 키 = O(1) 멤버십 검사)
+    image_urls = {}
+    for slide in slides:
+        img = _find(slide, 'img')
+        if img is not None and img.get('src'):
+            image_urls.setdefault(normalize_image_url(img.get('src')))
+    for src in prg_srcs:
+        image_urls.setdefault(normalize_image_url(src))
+    return list(image_urls)
+
+def parse_detail_page(html, known_hash=None):
+    """상세 페이지를 한 번만 파싱해 (이름, 사찰명, 주소, 연락처, 소개, 일정, 이미지, content_hash) 반환.
+    place div가 없으면 None, content_hash가 known_hash와 같으면 추출 없이 UNCHANGED"""
+    root = lxml_html.document_fromstring(html)
+
+    place_div = None
+    sections = []
+    slides = []
+    prg_srcs = []
+    intro_imgs = []
+
+    for el in root.iter():
+        tag = el.tag
+        if tag == 'div':
+            classes = _classes(el)
+            if 'place' in classes and place_div is None:
+                place_div = el
+            if 'section' in classes:
+                sections.append(el)
+            if 'swiper-slide' in classes:
+                slides.append(el)
+        elif tag == 'img':
+            src = el.get('src')
+            if src and 'templePrg' in src:
+                prg_srcs.append(src)
+            if el.get('alt') == '프로그램 소개':
+                intro_imgs.append(el)
+
+    if place_div is None:
+        return None
+
+    content_hash = fingerprint(_text(place_div), *[_text(s) for s in sections], *prg_srcs)
+    if known_hash and content_hash == known_hash:
+        return UNCHANGED
+
+    h3 = _find(place_div, 'h3')
+    templestay_name = _text(h3, strip=True) if h3 is not None else None
+    temple_name, address, phone = _info_fields(place_div)
+
+    return (
+        templestay_name,
+        temple_name,
+        address,
+        phone,
+        _intro_text(sections, intro_imgs),
+        _schedule(sections),
+        _image_urls(slides, prg_srcs),
+        content_hash,
+    )
+
+# --- BeautifulSoup 기반 기존 구현 (비교/벤치마크용) ---
+
+def extract_image_urls(soup):
+    """이미지 URL들을 추출하는 함수"""
+    image_urls = {}
+    
+    # swiper-slide 내의 이미지들 추출
+    swiper_slides = soup.find_all('div', class_='swiper-slide')
+    for slide in swiper_slides:
+        img = slide.find('img')
+        if img and img.get('src'):
+            image_urls.setdefault(normalize_image_url(img.get('src')))
+    
+    img_tags = soup.find_all('img')
+    for img in img_tags:
+        src = img.get('src')
+        if src and 'templePrg' in src:
+            image_urls.setdefault(normalize_image_url(src))
+    
+    return list(image_urls)
+
+def parse_program_schedule(html): 
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table')
+    if not table:
+        return None
+
+    rows = [[td.get_text(strip=True) for td in row.find_all('td')] for row in table.find_all('tr')[1:]]
+    return schedule_json(rows)
+
+def extract_introduction_text(soup):
+    program_sections = []
+    for section in soup.find_all('div', class_='section'):
+        h4 = section.find('h4')
+        if h4 and '프로그램 소개' in h4.get_text():
+            txt_div = section.find('div', class_='txt')
+            if txt_div and txt_div.find('p'):
+                program_sections.append(txt_div)
+
+    if not program_sections:
+        for div in soup.find_all('div'):
+            img = div.find('img', alt='프로그램 소개')
+            if img:
+                parent_section = div.parent
+                txt_div = parent_section.find('div', class_='txt')
+                if txt_div and txt_div.find('p') and all(txt_div is not s for s in program_sections):
+                    program_sections.append(txt_div)
+
+    all_text = []
+    for section in program_sections:
+        p_tags = section.find_all('p')
+        for p in p_tags:
+            all_text.append(clean_paragraph(p.get_text()))
+
+    return '\n\n'.join(all_text) if all_text else None
+
+def parse_detail_page_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    place_div = soup.find('div', class_='place')
+    if not place_div:
+        return None
+
+    templestay_name = place_div.find('h3').get_text(strip=True) if place_div.find('h3') else None
+
+    temple_name = None
+    address = None
+    phone = None
+
+    info_div = place_div.find('div', class_='info')
+    if info_div:
+        lis = info_div.find_all('li')
+        for li in lis:
+            img = li.find('img')
+            text_label = img['alt'] if img and 'alt' in img.attrs else ''
+            text_nodes = li.find_all(string=True, recursive=False)
+            text_value = ''.join(t.strip() for t in text_nodes if t.strip())
+
+            if '주소' in text_label:
+                temple_name, address = split_address(text_value)
+            elif '연락처' in text_label or PHONE_RE.search(text_value):
+                phone = extract_phone_number(text_value) or phone
+
+    introduction = extract_introduction_text(soup)
+
+    schedule = None
+    for section in soup.find_all("div", class_="section"):
+        h4 = section.find("h4")
+        if h4 and "프로그램 일정" in h4.get_text():
+            schedule_div = section.find("div", class_="table")
+            if schedule_div:
+                table = schedule_div.find("table")
+                if table:
+                    schedule = parse_program_schedule(str(table))
+            break
+
+    # 이미지 URL 추출
+    image_urls = extract_image_urls(soup)
+
+    return (templestay_name, temple_name, address, phone, introduction, schedule, image_urls,
+            detail_fingerprint(soup))
@@ -0,0 +1,127 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import psutil
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def resolve_chromedriver_path():
+    # ChromeDriverManager().install()은 매번 버전 확인을 하므로 프로세스당 한 번만 호출
+    path = ChromeDriverManager().install()
+    logger.info(f"chromedriver 경로 확인: {path}")
+    return path
+
+def driver_memory_mb(driver):
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+    except (psutil.Error, AttributeError):
+        return 0.0
+
+class PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+class DriverPool:
+    """max_workers 크기의 Selenium 드라이버 풀. URL 단위로 빌려주고 돌려받는다"""
+
+    def __init__(self, factory, size, max_pages=200, max_memory_mb=1024):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.startup_times = []
+        self.retired_pages = []
+        self.recycled = {}
+
+    def _spawn(self):
+        started = time.perf_counter()
+        driver = self.factory()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.startup_times.append(elapsed)
+        logger.info(f"드라이버 생성 완료 ({elapsed:.2f}s)")
+        return PooledDriver(driver)
+
+    def _is_healthy(self, item):
+        try:
+            item.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _retire(self, item, reason):
+        with self._lock:
+            self.retired_pages.append(item.pages)
+            self.recycled[reason] = self.recycled.get(reason, 0) + 1
+        logger.info(f"드라이버 교체 ({reason}): {item.pages}페이지 처리")
+        try:
+            item.driver.quit()
+        except Exception as e:
+            logger.warning(f"드라이버 종료 실패: {e}")
+
+    def warm(self, count=None):
+        count = self.size if count is None else min(count, self.size)
+        for _ in range(count):
+            self._idle.put(self._spawn())
+
+    @contextmanager
+    def checkout(self):
+        self._slots.acquire()
+        try:
+            try:
+                item = self._idle.get_nowait()
+            except queue.Empty:
+                item = None
+
+            if item is not None and not self._is_healthy(item):
+                self._retire(item, "health check 실패")
+                item = None
+            if item is None:
+                item = self._spawn()
+
+            try:
+                yield item.driver
+            finally:
+                item.pages += 1
+                if item.pages >= self.max_pages:
+                    self._retire(item, "페이지 한도")
+                elif self.max_memory_mb and driver_memory_mb(item.driver) > self.max_memory_mb:
+                    self._retire(item, "메모리 한도")
+                else:
+                    self._idle.put(item)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                item = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(item, "종료")
+
+    def summary(self):
+        with self._lock:
+            spawned = len(self.startup_times)
+            if not spawned:
+                return "드라이버 생성 없음"
+            avg_startup = sum(self.startup_times) / spawned
+            pages = sum(self.retired_pages)
+            avg_pages = pages / len(self.retired_pages) if self.retired_pages else 0.0
+            recycled = ", ".join(f"{k} {v}" for k, v in self.recycled.items())
+            return (
+                f"드라이버 {spawned}개 생성, 평균 기동 {avg_startup:.2f}s, "
+                f"드라이버당 평균 {avg_pages:.1f}페이지 (교체: {recycled or '없음'})"
+            )
@@ -1,28 +1,31 @@
+import argparse
+import glob
+import hashlib
+import os
+import numpy as np
 import pandas as pd
-import pymysql
-import yaml
 import re
 
+from bulk import bulk_update_bits
+from db import close_pool, get_connection
+from metrics import metrics
+from name_matcher import NameMatcher, write_match_report
+
+CSV_PATH = os.environ.get("JEOLLOGA_ETC_CSV", "C:\\jeolloga-crawling\\data\\etc.csv")
+CSV_ENCODING = 'cp949'
+CHUNK_SIZE = 50000
+FUZZY_THRESHOLD = 0.75
+MATCH_REPORT_PATH = 'etc_match_report.csv'
+
 ETC_MAP = {
     '주차 가능': 0b001,
     '1인실': 0b010,
     '단체 가능': 0b100,
 }
 
-def load_db_config(file_path):
-    with open(file_path, "r", encoding="utf-8") as file:
-        return yaml.safe_load(file).get("database")
-
-def get_connection(config):
-    return pymysql.connect(
-        host=config["host"],
-        user=config["user"],
-        password=config["password"],
-        db=config["database"],
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=False
-    )
+# 태그 → 비트 조회표 (categorical 코드 순서, 없는 태그는 코드 -1 → 마지막 0)
+ETC_TAGS = pd.CategoricalDtype(list(ETC_MAP))
+ETC_BITS = np.array(list(ETC_MAP.values()) + [0], dtype=np.int64)
 
 def normalize(name):
     if not isinstance(name, str):
@@ -33,71 +36,228 @@ def normalize(name):
     name = name.replace('\xa0', '')
     return name
 
+def normalize_names(names):
+    # normalize와 같은 규칙을 pandas 문자열 메서드로 (문자열이 아닌 값은 NaN → '')
+    return (
+        names.astype(object).str.replace(r'\s+', '', regex=True)
+        .str.replace('（', '(', regex=False)
+        .str.replace('）', ')', regex=False)
+        .fillna('')
+    )
+
 def load_temple_name_to_ids(conn):
+    # 반환: DataFrame(templestay_id, temple_name) - temple_name은 정규화된 값
     with conn.cursor() as cursor:
         cursor.execute("SELECT id, temple_name FROM templestay WHERE temple_name IS NOT NULL")
         rows = cursor.fetchall()
-        mapping = {}
-        for row in rows:
-            key = normalize(row['temple_name'])
-            mapping.setdefault(key, []).append(row['id'])
-        return mapping
+    names = pd.DataFrame(rows, columns=['templestay_id', 'temple_name'])
+    names['temple_name'] = normalize_names(names['temple_name'])
+    return names
+
+def _or_reduce_groups(values, group_codes):
+    # group_codes 순으로 정렬한 뒤 그룹 경계마다 bitwise_or.reduceat
+    order = np.argsort(group_codes, kind='stable')
+    sorted_codes = group_codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    return np.bitwise_or.reduceat(values[order], starts)
+
+def tag_bits(etc):
+    # 행별 etc 비트. 서로 다른 etc 문자열은 몇 가지뿐이므로 고유값만 펼쳐서 계산하고 행에 다시 배분
+    codes, uniques = pd.factorize(etc)
+    if not len(uniques):
+        return np.zeros(len(etc), dtype=np.int64)
+    tags = pd.Series(uniques, dtype=object).str.split(',').explode().str.strip()
+    bits = ETC_BITS[ETC_TAGS.categories.get_indexer(tags)]
+    unique_bits = _or_reduce_groups(bits, tags.index.to_numpy())
+    return np.append(unique_bits, 0)[codes]
 
 def calculate_etc_bit(df):
-    df['temple_name'] = df['temple_name'].fillna('').apply(normalize)
-    df['etc'] = df['etc'].fillna('')
-    return (
-        df.groupby('temple_name')['etc']
-        .apply(lambda items: sum(
-            ETC_MAP.get(bit.strip(), 0)
-            for line in items
-            for bit in line.split(',')
-            if bit.strip()
-        ))
-        .reset_index(name='etc_bit')
-    )
+    """사찰별 etc 비트. 같은 태그가 여러 번 나와도 합이 아니라 OR로 합친다"""
+    names = normalize_names(df['temple_name'])
+    bits = tag_bits(df['etc'])
+    group_codes, uniques = pd.factorize(names, sort=True)
+    reduced = _or_reduce_groups(bits, group_codes) if len(bits) else np.array([], dtype=np.int64)
+    return pd.DataFrame({'temple_name': uniques, 'etc_bit': reduced})
+
+def match_etc_bits(etc_df, names, resolver=None):
+    # 반환: [(templestay_id, etc_bit), ...]
+    # 정확히 같은 이름은 merge로 연결하고, resolver가 있으면 merge에서 빠진 이름만 유사 매칭
+    matched = etc_df.merge(names, on='temple_name', how='inner')
+    pairs = list(zip(matched['templestay_id'].astype(int).tolist(), matched['etc_bit'].astype(int).tolist()))
+    if resolver is not None:
+        missed = etc_df[~etc_df['temple_name'].isin(names['temple_name'])]
+        for name, bit in zip(missed['temple_name'].tolist(), missed['etc_bit'].tolist()):
+            pairs.extend((int(templestay_id), int(bit)) for templestay_id in resolver.resolve(name))
+    return pairs
+
+def iter_csv_paths(source):
+    # 파일 하나 또는 디렉터리 안의 *.csv (이름 순)
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.csv')))
+    return [source]
+
+def file_hash(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _read_csv_chunks(path, chunksize):
+    return pd.read_csv(path, encoding=CSV_ENCODING, usecols=['temple_name', 'etc'], dtype=str,
+                       chunksize=chunksize)
+
+def iter_etc_chunks(path, chunksize=CHUNK_SIZE, cache_dir=None):
+    """CSV를 chunksize행씩 읽는다. cache_dir를 주면 파일 해시로 Parquet 사본을 만들어 다음 실행부터는 그것을 읽는다"""
+    if not cache_dir:
+        yield from _read_csv_chunks(path, chunksize)
+        return
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow가 없어 Parquet 캐시 없이 CSV를 읽습니다.")
+        yield from _read_csv_chunks(path, chunksize)
+        return
+
+    cache_path = os.path.join(cache_dir, f"{file_hash(path)}.parquet")
+    if os.path.exists(cache_path):
+        for batch in pq.ParquetFile(cache_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    # CSV를 끝까지 읽었을 때만 캐시를 확정 (중간에 실패하면 임시 파일을 지운다)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    schema = pa.schema([('temple_name', pa.string()), ('etc', pa.string())])
+    writer = pq.ParquetWriter(tmp_path, schema)
+    try:
+        for chunk in _read_csv_chunks(path, chunksize):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield chunk
+        writer.close()
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            writer.close()
+            os.remove(tmp_path)
+
+class EtcAccumulator:
+    """정규화된 사찰 이름별 etc 비트를 청크마다 OR로 누적. 메모리는 행 수가 아니라 사찰 수에 비례"""
+
+    def __init__(self):
+        self.bits = {}
+
+    def add(self, chunk):
+        # 반환: 이번 청크로 처음 나왔거나 비트가 바뀐 사찰의 누적값 DataFrame(temple_name, etc_bit)
+        etc_df = calculate_etc_bit(chunk)
+        changed_names = []
+        changed_bits = []
+        for name, bit in zip(etc_df['temple_name'].tolist(), etc_df['etc_bit'].tolist()):
+            old = self.bits.get(name)
+            new = bit if old is None else old | bit
+            if new != old:
+                self.bits[name] = new
+                changed_names.append(name)
+                changed_bits.append(new)
+        return pd.DataFrame({'temple_name': changed_names, 'etc_bit': changed_bits})
+
+class NameResolver:
+    """정확히 일치하지 않는 CSV 사찰 이름 → templestay_id. NameMatcher로 이름마다 한 번만 찾아 결과를 기억한다"""
+
+    def __init__(self, names, threshold=FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self.matcher = NameMatcher(names.groupby('temple_name')['templestay_id'].apply(list).to_dict())
+        self.results = {}
+
+    def resolve(self, name):
+        result = self.results.get(name)
+        if result is None:
+            result = self.results[name] = self.matcher.match(name, self.threshold)
+        return result[2]
+
+    def report_rows(self):
+        # 정확히 일치하지 않은 이름 전부 (fuzzy 일치도 확인할 수 있게 함께 남긴다)
+        rows = []
+        for name, (status, db_name, _, score) in sorted(self.results.items()):
+            candidates = '|'.join(f"{n}:{s:.2f}" for s, n, _ in self.matcher.candidates(name, k=3))
+            rows.append((name, status, db_name or '', f"{score:.3f}", candidates))
+        return rows
+
+    def counts(self):
+        counts = {}
+        for status, _, _, _ in self.results.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
 
-def generate_case_update_sql(templestay_id_bit_pairs):
-    case_lines = []
-    ids = []
-    for tid, bit in templestay_id_bit_pairs:
-        case_lines.append(f"WHEN f.templestay_id = {tid} THEN {bit}")
-        ids.append(str(tid))
-    case_sql = "SET f.etc = CASE\n" + "\n".join(case_lines) + "\nELSE f.etc END"
-    where_in = ", ".join(ids)
-    return f"""
-    UPDATE filter f
-    {case_sql}
-    WHERE f.templestay_id IN ({where_in});
-    """
-
-def main():
-    csv_path = "C:\\jeolloga-crawling\\data\\etc.csv"
-    db_config_path = "C:\\jeolloga-crawling\\data\\db_config.yaml"
-    df = pd.read_csv(csv_path, encoding='cp949')
-    config = load_db_config(db_config_path)
-    conn = get_connection(config)
+class IdBitsAccumulator:
+    """templestay_id별 etc 비트를 OR로 누적. 여러 CSV 이름(정확/유사 매칭)이 같은 사찰로 이어질 수 있다"""
+
+    def __init__(self):
+        self.bits = pd.Series(dtype=np.int64)
+
+    def add(self, pairs):
+        # 반환: 누적 비트가 바뀐 [(templestay_id, etc_bit), ...] (id당 한 번)
+        if not pairs:
+            return []
+        pairs = np.asarray(pairs, dtype=np.int64)
+        ids, codes = np.unique(pairs[:, 0], return_inverse=True)
+        bits = _or_reduce_groups(pairs[:, 1], codes)
+
+        old = self.bits.reindex(ids)
+        present = old.notna().to_numpy()
+        old = old.fillna(0).to_numpy(dtype=np.int64)
+        new = np.where(present, old | bits, bits)
+        changed = ~present | (new != old)
+        self.bits = pd.Series(new, index=ids).combine_first(self.bits).astype(np.int64)
+        return list(zip(ids[changed].tolist(), new[changed].tolist()))
+
+def ingest_etc(conn, source, chunksize=CHUNK_SIZE, cache_dir=None, fuzzy_threshold=FUZZY_THRESHOLD,
+               report_path=MATCH_REPORT_PATH):
+    """CSV 파일(또는 디렉터리)을 청크 단위로 읽어, 누적 비트가 바뀐 사찰만 그때그때 반영. 반영 건수 반환"""
+    names = load_temple_name_to_ids(conn)
+    resolver = NameResolver(names, fuzzy_threshold) if fuzzy_threshold else None
+    accumulator = EtcAccumulator()
+    id_bits = IdBitsAccumulator()
+    updated = 0
+    rows = 0
+
+    for path in iter_csv_paths(source):
+        chunks = iter_etc_chunks(path, chunksize, cache_dir)
+        while True:
+            with metrics.time('parse'):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                changed = accumulator.add(chunk)
+                pairs = id_bits.add(match_etc_bits(changed, names, resolver))
+            rows += len(chunk)
+            if pairs:
+                # 누적값으로 덮어쓰므로 같은 사찰이 여러 번 반영돼도 최종 결과는 전체를 한 번에 계산한 것과 같다
+                bulk_update_bits(conn, "filter", "templestay_id", "etc", pairs)
+                updated += len(pairs)
+            print(f">> {os.path.basename(path)}: {rows}행 처리, 누적 사찰 {len(accumulator.bits)}개, 반영 {updated}건")
+
+    if resolver is not None and resolver.results:
+        counts = resolver.counts()
+        print(f"이름 유사 매칭: 일치 {counts.get('exact', 0) + counts.get('fuzzy', 0)}개, "
+              f"모호 {counts.get('ambiguous', 0)}개, 미일치 {counts.get('unmatched', 0)}개")
+        if report_path:
+            write_match_report(report_path, resolver.report_rows())
+            print(f"매칭 리포트 저장: {report_path}")
+
+    return updated
+
+def main(source=CSV_PATH, chunksize=CHUNK_SIZE, cache_dir=None, fuzzy_threshold=FUZZY_THRESHOLD,
+         report_path=MATCH_REPORT_PATH):
+    conn = get_connection()
 
     try:
-        name_to_ids = load_temple_name_to_ids(conn)
-        etc_df = calculate_etc_bit(df)
-
-        templestay_id_bit_pairs = []
-        for _, row in etc_df.iterrows():
-            temple_name = row['temple_name']
-            bit = row['etc_bit']
-            ids = name_to_ids.get(temple_name, [])
-            for tid in ids:
-                templestay_id_bit_pairs.append((tid, bit))
-
-        if not templestay_id_bit_pairs:
+        updated = ingest_etc(conn, source, chunksize, cache_dir, fuzzy_threshold, report_path)
+        if not updated:
             print("일치하는 temple_name이 없습니다. 업데이트 생략.")
             return
-
-        sql = generate_case_update_sql(templestay_id_bit_pairs)
-        with conn.cursor() as cursor:
-            cursor.execute(sql)
-        conn.commit()
         print("etc 비트 업데이트 완료")
 
     except Exception as e:
@@ -105,5 +265,18 @@ def main():
         print(f"에러 발생: {e}")
     finally:
         conn.close()
+        close_pool()
+        print(f"단계별 측정: {metrics.summary()}")
+        metrics.write_report('etc')
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="협력사 CSV의 etc 태그를 filter.etc 비트로 반영")
+    parser.add_argument("--csv", default=CSV_PATH, help="CSV 파일 또는 CSV가 들어 있는 디렉터리")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="한 번에 읽을 행 수")
+    parser.add_argument("--cache-dir", help="파일 해시별 Parquet 캐시 디렉터리 (pyarrow 필요)")
+    parser.add_argument("--fuzzy-threshold", type=float, default=FUZZY_THRESHOLD,
+                        help="이름 유사도 기준 (0~1, 0이면 정확히 일치하는 이름만 반영)")
+    parser.add_argument("--match-report", default=MATCH_REPORT_PATH,
+                        help="정확히 일치하지 않은 이름의 매칭 결과 CSV (빈 값이면 저장하지 않음)")
+    args = parser.parse_args()
+    main(args.csv, args.chunksize, args.cache_dir, args.fuzzy_threshold, args.match_report)
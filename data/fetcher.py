@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metrics import metrics
+from page_cache import fetch_cached
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "ko-KR,ko;q=0.9",
+}
+
+def create_session(pool_size=10):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+class FetchStats:
+    """전략별 성공/실패 횟수와 소요 시간을 모으는 객체 (스레드 안전)"""
+
+    OUTCOMES = ("hit", "miss", "error")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.elapsed = {}
+
+    def record(self, strategy, outcome, elapsed):
+        with self._lock:
+            counts = self.counts.setdefault(strategy, dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+            self.elapsed[strategy] = self.elapsed.get(strategy, 0.0) + elapsed
+
+    def summary(self):
+        with self._lock:
+            lines = []
+            for strategy, counts in self.counts.items():
+                total = sum(counts.values())
+                avg_ms = self.elapsed[strategy] / total * 1000 if total else 0.0
+                lines.append(
+                    f"{strategy}: hit {counts['hit']}, miss {counts['miss']}, "
+                    f"error {counts['error']}, 평균 {avg_ms:.0f}ms"
+                )
+            return lines
+
+    def log_summary(self):
+        for line in self.summary():
+            logger.info(f"페치 전략 통계 - {line}")
+
+class HttpStrategy:
+    name = "http"
+
+    def __init__(self, session, timeout=10, cache=None):
+        self.session = session
+        self.timeout = timeout
+        self.cache = cache
+
+    def fetch(self, url):
+        # 변경되지 않은 페이지는 조건부 요청(304)으로 캐시된 본문을 재사용
+        return fetch_cached(self.session, url, self.cache, self.timeout)
+
+    def close(self):
+        pass
+
+class BrowserStrategy:
+    name = "browser"
+
+    def __init__(self, driver_pool, limiter, wait_selector="div.place", render_timeout=5):
+        self.driver_pool = driver_pool
+        self.limiter = limiter
+        self.wait_selector = wait_selector
+        self.render_timeout = render_timeout
+
+    def fetch(self, url):
+        # 드라이버는 URL 하나를 처리하는 동안만 풀에서 빌린다
+        self.limiter.wait(url)
+        with self.driver_pool.checkout() as driver, metrics.time('browser_render'):
+            started = time.monotonic()
+            try:
+                driver.get(url)
+            except Exception:
+                self.limiter.feedback(url, None, time.monotonic() - started)
+                raise
+            self.limiter.feedback(url, 200, time.monotonic() - started)
+            # 고정 대기 대신 필요한 블록이 렌더링될 때까지만 기다린다
+            try:
+                WebDriverWait(driver, self.render_timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self.wait_selector))
+                )
+            except TimeoutException:
+                pass
+            return driver.page_source
+
+    def close(self):
+        pass
+
+class FallbackFetcher:
+    """전략을 순서대로 시도하고, parse가 None이 아닌 결과를 돌려준 첫 전략을 사용"""
+
+    def __init__(self, strategies, stats=None):
+        self.strategies = strategies
+        self.stats = stats if stats is not None else FetchStats()
+
+    def fetch(self, url, parse):
+        for strategy in self.strategies:
+            started = time.perf_counter()
+            try:
+                html = strategy.fetch(url)
+                with metrics.time('parse'):
+                    result = parse(html)
+            except Exception as e:
+                self.stats.record(strategy.name, "error", time.perf_counter() - started)
+                logger.warning(f"{strategy.name} 페치 실패 ({url}): {e}")
+                continue
+
+            elapsed = time.perf_counter() - started
+            if result is not None:
+                # 페이지 수는 HTTP 실패 후 브라우저로 성공해도 한 번만 센다
+                metrics.inc('pages')
+                self.stats.record(strategy.name, "hit", elapsed)
+                return result, strategy.name
+
+            self.stats.record(strategy.name, "miss", elapsed)
+            logger.info(f"{strategy.name} 결과에 필요한 블록 없음, 다음 전략 시도: {url}")
+
+        return None, None
+
+    def close(self):
+        for strategy in self.strategies:
+            strategy.close()
+
+class ProcessParser:
+    """parse 함수를 별도 프로세스에서 실행하는 callable. FallbackFetcher의 parse 자리에 그대로 넣는다.
+    페치 스레드는 결과를 기다리는 동안 GIL을 잡지 않으므로 파싱이 CPU 코어 수만큼 병렬로 돈다"""
+
+    def __init__(self, parse, workers=None):
+        self.parse = parse
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __call__(self, html, **kwargs):
+        return self.executor.submit(self.parse, html, **kwargs).result()
+
+    def close(self):
+        self.executor.shutdown()
@@ -1,8 +1,17 @@
-import pymysql
-import requests
+import argparse
+import heapq
 from bs4 import BeautifulSoup
-import time
-import yaml
+
+from concurrent.futures import ThreadPoolExecutor
+
+from bulk import bulk_update
+from db import close_pool, get_connection
+from fetcher import create_session
+from fingerprint import ensure_hash_column, fingerprint, price_fingerprint
+from keyword_matcher import KeywordMatcher
+from metrics import metrics
+from page_cache import fetch_cached, get_page_cache
+from throttle import PoliteSession
 
 ACTIVITY_MAP = {
     '108배':         0b000001,
@@ -13,6 +22,12 @@ ACTIVITY_MAP = {
     '명상':          0b100000,
 }
 
+# 일정/주소에 다른 표기로 쓰이는 경우 (띄어쓰기를 뺀 표기는 자동으로 추가됨)
+ACTIVITY_ALIASES = {
+    '스님과의 차담': ['스님과 차담'],
+    '염주 만들기': ['염주 꿰기'],
+}
+
 REGION_MAP = {
     '강원': 1 << 0, '경기': 1 << 1, '경상남도': 1 << 2, '경상북도': 1 << 3,
     '광주': 1 << 4, '대구': 1 << 5, '대전': 1 << 6, '부산': 1 << 7,
@@ -21,23 +36,19 @@ REGION_MAP = {
     '울산': 1 << 15, '세종': 1 << 16,
 }
 
-BATCH_SIZE = 100
+REGION_ALIASES = {
+    '경상남도': ['경남'], '경상북도': ['경북'],
+    '전라남도': ['전남'], '전라북도': ['전북'],
+    '충청남도': ['충남'], '충청북도': ['충북'],
+}
 
-def load_db_config(file_path):
-    with open(file_path, "r", encoding="utf-8") as file:
-        config = yaml.safe_load(file)
-        return config.get("database")
-
-def get_connection(config):
-    return pymysql.connect(
-        host=config["host"],
-        user=config["user"],
-        password=config["password"],
-        db=config["database"],
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=False
-    )
+ACTIVITY_MATCHER = KeywordMatcher(ACTIVITY_MAP, ACTIVITY_ALIASES)
+REGION_MATCHER = KeywordMatcher(REGION_MAP, REGION_ALIASES)
+
+# 추출 규칙이 바뀌면 지문도 달라져서 기존 행이 다시 계산되도록 함
+RULES_VERSION = fingerprint(repr(ACTIVITY_MAP), repr(ACTIVITY_ALIASES), repr(REGION_MAP), repr(REGION_ALIASES))
+
+BATCH_SIZE = 100
 
 def extract_price(soup):
     table = soup.select_one('div.table table')
@@ -58,31 +69,77 @@ def extract_price(soup):
     return 0
 
 def extract_activity(schedule):
-    if not schedule:
-        return 0
-    bit = 0
-    for k, v in ACTIVITY_MAP.items():
-        if k in schedule:
-            bit |= v
-    return bit
+    return ACTIVITY_MATCHER.match_bits(schedule)
 
 def extract_region(address):
-    if not address:
+    tokens = address.split() if address else []
+    if not tokens:
         return 0
-    for region, bit in REGION_MAP.items():
-        if region in address.split()[0]:
-            return bit
-    return 0
+    return REGION_MATCHER.first_match(tokens[0])
 
-def batch_update_filter(config):
-    conn = get_connection(config)
+# 업데이트 튜플: (price, activity, region, content_hash, templestay_id)
+FILTER_COLUMNS = ("price", "activity", "region", "content_hash")
+
+def compute_filter_update(row, session=None):
+    # session이 None이면 DB 컬럼(schedule/address)만으로 activity/region을 다시 계산하고 가격은 유지
+    tid = row['id']
+    schedule = row['schedule']
+    address = row['address']
+    old_price = row['old_price']
+    old_activity = row['old_activity']
+    old_region = row['old_region']
+    old_hash = row['content_hash']
+
+    new_activity = extract_activity(schedule)
+    new_region = extract_region(address)
+
+    if session is None:
+        if (new_activity, new_region) == (old_activity, old_region):
+            return None, "변화 없음"
+        return (old_price, new_activity, new_region, old_hash, tid), "변경"
+
+    try:
+        html = fetch_cached(session, row['url'])
+    except Exception as e:
+        return None, f"크롤링 실패: {e}"
+
+    metrics.inc('pages')
+    with metrics.time('parse'):
+        detail_soup = BeautifulSoup(html, 'html.parser')
+        # 가격표/일정/주소 지문이 저장된 값과 같으면 추출과 DB 쓰기를 모두 건너뜀
+        content_hash = price_fingerprint(detail_soup, schedule, address, RULES_VERSION)
+        if content_hash == old_hash and None not in (old_price, old_activity, old_region):
+            return None, "변화 없음"
+        new_price = extract_price(detail_soup)
+
+    update = (new_price, new_activity, new_region, content_hash, tid)
+    if (
+        new_price != old_price or
+        new_activity != old_activity or
+        new_region != old_region
+    ):
+        return update, "변경"
+    return update, "지문 갱신"
+
+def flush_filter_updates(conn, batch_data):
+    # 행마다 UPDATE하지 않고 임시 테이블 JOIN 한 번으로 반영 (시간/행 수는 bulk에서 기록)
+    bulk_update(conn, "filter", "templestay_id", FILTER_COLUMNS, batch_data, name="filter 업데이트")
+    print(f"{len(batch_data)}건 배치 업데이트 완료")
+    return len(batch_data)
+
+def batch_update_filter(full_refresh=False, workers=4):
+    conn = get_connection()
+    session = PoliteSession(create_session(pool_size=max(10, workers)))
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT t.id, t.url, t.schedule, t.address, f.price AS old_price, f.activity AS old_activity, f.region AS old_region
+        ensure_hash_column(conn, 'filter')
+        where = "" if full_refresh else "WHERE f.price IS NULL OR f.activity IS NULL OR f.region IS NULL"
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute(f"""
+                SELECT t.id, t.url, t.schedule, t.address, f.price AS old_price, f.activity AS old_activity,
+                       f.region AS old_region, f.content_hash
                 FROM templestay t
                 JOIN filter f ON t.id = f.templestay_id
-                WHERE f.price IS NULL OR f.activity IS NULL OR f.region IS NULL
+                {where}
                 ORDER BY t.id ASC
             """)
             rows = cursor.fetchall()
@@ -91,78 +148,51 @@ def batch_update_filter(config):
             print("업데이트할 대상이 없습니다.")
             return
 
+        # 가격이 필요한 행만 HTTP 요청, 나머지는 DB 컬럼만으로 계산
+        fetch_rows = [row for row in rows if full_refresh or row['old_price'] is None]
+        local_rows = [row for row in rows if not (full_refresh or row['old_price'] is None)]
+        print(f"대상 {len(rows)}건 (페이지 요청 {len(fetch_rows)}건, DB 컬럼만 재계산 {len(local_rows)}건)")
+
         batch_data = []
         total_count = 0
 
-        for idx, row in enumerate(rows, start=1):
-            tid = row['id']
-            url = row['url']
-            schedule = row['schedule']
-            address = row['address']
-            old_price = row['old_price']
-            old_activity = row['old_activity']
-            old_region = row['old_region']
-
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                detail_soup = BeautifulSoup(response.text, 'html.parser')
-            except Exception as e:
-                print(f"ID {tid} 크롤링 실패: {e}")
-                continue
-
-            new_price = extract_price(detail_soup)
-            new_activity = extract_activity(schedule)
-            new_region = extract_region(address)
-
-            if (
-                new_price != old_price or
-                new_activity != old_activity or
-                new_region != old_region
-            ):
-                batch_data.append((new_price, new_activity, new_region, tid))
-                print(f"[{idx}] ID:{tid} 변경")
-            else:
-                print(f"[{idx}] ID:{tid} 변화 없음")
-
-            if len(batch_data) >= BATCH_SIZE:
-                with conn.cursor() as cursor:
-                    cursor.executemany("""
-                        UPDATE filter
-                        SET price = %s,
-                            activity = %s,
-                            region = %s
-                        WHERE templestay_id = %s
-                    """, batch_data)
-                conn.commit()
-                print(f"{len(batch_data)}건 배치 업데이트 완료")
-                total_count += len(batch_data)
-                batch_data.clear()
-
-            time.sleep(0.2)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 두 목록 모두 id 순이고 executor.map도 입력 순서대로 결과를 돌려주므로,
+            # id로 병합하면 로컬 계산 행과 페이지 요청 행이 섞여도 커밋은 id 순서를 유지
+            local_results = ((row, compute_filter_update(row)) for row in local_rows)
+            fetch_results = zip(fetch_rows, executor.map(lambda row: compute_filter_update(row, session), fetch_rows))
+            merged = heapq.merge(local_results, fetch_results, key=lambda item: item[0]['id'])
+            for idx, (row, (update, status)) in enumerate(merged, start=1):
+                print(f"[{idx}] ID:{row['id']} {status}")
+                if update is None:
+                    continue
+
+                batch_data.append(update)
+                if len(batch_data) >= BATCH_SIZE:
+                    total_count += flush_filter_updates(conn, batch_data)
+                    batch_data.clear()
 
         if batch_data:
-            with conn.cursor() as cursor:
-                cursor.executemany("""
-                    UPDATE filter
-                    SET price = %s,
-                        activity = %s,
-                        region = %s
-                    WHERE templestay_id = %s
-                """, batch_data)
-            conn.commit()
-            total_count += len(batch_data)
-            print(f"{len(batch_data)}건 배치 업데이트 완료")
+            total_count += flush_filter_updates(conn, batch_data)
 
         print(f"\n총 {total_count}건 업데이트 완료")
+        print(f"페이지 캐시: {get_page_cache().stats}, 재시도 {session.retries}회, 속도 {session.limiter.rates()}")
 
     except Exception as e:
         print(f"에러 발생: {e}")
         conn.rollback()
     finally:
         conn.close()
+        print(f"단계별 측정: {metrics.summary()}")
+        metrics.write_report('filter')
 
 if __name__ == "__main__":
-    db_config_path = "C:\\jeolloga-crawling\\data\\db_config.yaml"
-    db_config = load_db_config(db_config_path)
-    batch_update_filter(db_config)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="filter 테이블 가격/활동/지역 비트 재계산")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 페이지를 가져올 작업자 수")
+    parser.add_argument("--full-refresh", action="store_true", help="NULL이 아닌 행도 모두 다시 확인")
+    args = parser.parse_args()
+
+    try:
+        batch_update_filter(full_refresh=args.full_refresh, workers=args.workers)
+    finally:
+        close_pool()
\ No newline at end of file
@@ -0,0 +1,166 @@
+import numpy as np
+
+BIT_COLUMNS = ('type', 'activity', 'region', 'etc')
+COLUMNS = ('templestay_id',) + BIT_COLUMNS + ('price',)
+NO_PRICE = -1
+
+def _as_tuple(row):
+    if isinstance(row, dict):
+        return tuple(row[c] for c in COLUMNS)
+    return tuple(row)
+
+def _normalize(rows):
+    ids, bits, prices = [], [], []
+    for row in map(_as_tuple, rows):
+        ids.append(row[0])
+        bits.append([v or 0 for v in row[1:5]])
+        prices.append(NO_PRICE if row[5] is None else row[5])
+    return (
+        np.asarray(ids, dtype=np.int64),
+        np.asarray(bits, dtype=np.uint32).reshape(-1, len(BIT_COLUMNS)),
+        np.asarray(prices, dtype=np.int32),
+    )
+
+class FilterIndex:
+    """filter 테이블 전체를 NumPy 컬럼으로 들고 비트마스크/가격 조건을 벡터 연산으로 처리하는 인덱스"""
+
+    def __init__(self, rows=()):
+        self.ids, bits, self.price = _normalize(rows)
+        self.bits = {name: bits[:, i].copy() for i, name in enumerate(BIT_COLUMNS)}
+        self._sort()
+
+    @classmethod
+    def load(cls, conn):
+        return cls(fetch_filter_rows(conn))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _sort(self):
+        order = np.argsort(self.ids, kind='stable')
+        self.ids = self.ids[order]
+        self.price = self.price[order]
+        for name in BIT_COLUMNS:
+            self.bits[name] = self.bits[name][order]
+
+    def upsert(self, rows):
+        ids, bits, price = _normalize(rows)
+        if not len(ids):
+            return
+        # 같은 id가 여러 번 오면 마지막 행만 남긴다 (새 id가 두 번 붙지 않도록)
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = len(ids) - 1 - last
+        ids, bits, price = ids[keep], bits[keep], price[keep]
+
+        pos = np.searchsorted(self.ids, ids)
+        pos_clipped = np.minimum(pos, max(len(self.ids) - 1, 0))
+        exists = (pos < len(self.ids)) & (self.ids[pos_clipped] == ids) if len(self.ids) else np.zeros(len(ids), bool)
+
+        # 이미 있는 행은 제자리에서 갱신
+        target = pos[exists]
+        self.price[target] = price[exists]
+        for i, name in enumerate(BIT_COLUMNS):
+            self.bits[name][target] = bits[exists, i]
+
+        # 새 행은 붙인 뒤 id 순으로 다시 정렬
+        new = ~exists
+        if new.any():
+            self.ids = np.concatenate([self.ids, ids[new]])
+            self.price = np.concatenate([self.price, price[new]])
+            for i, name in enumerate(BIT_COLUMNS):
+                self.bits[name] = np.concatenate([self.bits[name], bits[new, i]])
+            self._sort()
+
+    def remove(self, ids):
+        keep = ~np.isin(self.ids, np.asarray(list(ids), dtype=np.int64))
+        self.ids = self.ids[keep]
+        self.price = self.price[keep]
+        for name in BIT_COLUMNS:
+            self.bits[name] = self.bits[name][keep]
+
+    def refresh(self, conn, ids):
+        # 변경된 templestay_id만 다시 읽어 반영하고, DB에서 사라진 id는 제거
+        ids = list(ids)
+        rows = fetch_filter_rows(conn, ids)
+        found = {_as_tuple(row)[0] for row in rows}
+        self.upsert(rows)
+        self.remove([tid for tid in ids if tid not in found])
+
+    def mask(self, any_of=None, all_of=None, min_price=None, max_price=None):
+        # any_of/all_of: {'type': 0b011, 'region': ...} 형태
+        mask = np.ones(len(self.ids), dtype=bool)
+        for name, bits in (any_of or {}).items():
+            if bits:
+                mask &= (self.bits[name] & np.uint32(bits)) != 0
+        for name, bits in (all_of or {}).items():
+            if bits:
+                mask &= (self.bits[name] & np.uint32(bits)) == np.uint32(bits)
+        if min_price is not None or max_price is not None:
+            mask &= self.price != NO_PRICE
+            if min_price is not None:
+                mask &= self.price >= min_price
+            if max_price is not None:
+                mask &= self.price <= max_price
+        return mask
+
+    def query(self, any_of=None, all_of=None, min_price=None, max_price=None, sort='id', limit=None):
+        # sort: 'id', 'price', '-price' (가격 정렬 시 가격 없는 행은 맨 뒤, 같은 가격은 id 순)
+        idx = np.flatnonzero(self.mask(any_of, all_of, min_price, max_price))
+        if sort in ('price', '-price'):
+            price = self.price[idx].astype(np.int64)
+            key = np.where(price == NO_PRICE, np.iinfo(np.int64).max, price if sort == 'price' else -price)
+            idx = idx[np.argsort(key, kind='stable')]
+        if limit is not None:
+            idx = idx[:limit]
+        return self.ids[idx]
+
+def fetch_filter_rows(conn, ids=None, chunk_size=1000):
+    select = f"SELECT {', '.join(COLUMNS)} FROM filter"
+    cursor = conn.cursor()
+    try:
+        if ids is None:
+            cursor.execute(select + " ORDER BY templestay_id")
+            return cursor.fetchall()
+
+        rows = []
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            cursor.execute(f"{select} WHERE templestay_id IN ({','.join(['%s'] * len(chunk))})", tuple(chunk))
+            rows.extend(cursor.fetchall())
+        return rows
+    finally:
+        cursor.close()
+
+def build_filter_sql(any_of=None, all_of=None, min_price=None, max_price=None, sort='id', limit=None,
+                     placeholder='%s'):
+    # FilterIndex.query와 같은 조건의 SQL (벤치마크 비교용)
+    where, params = [], []
+    for name, bits in (any_of or {}).items():
+        if bits:
+            where.append(f"({name} & {placeholder}) != 0")
+            params.append(bits)
+    for name, bits in (all_of or {}).items():
+        if bits:
+            where.append(f"({name} & {placeholder}) = {placeholder}")
+            params.extend([bits, bits])
+    if min_price is not None or max_price is not None:
+        where.append("price IS NOT NULL")
+        if min_price is not None:
+            where.append(f"price >= {placeholder}")
+            params.append(min_price)
+        if max_price is not None:
+            where.append(f"price <= {placeholder}")
+            params.append(max_price)
+
+    sql = "SELECT templestay_id FROM filter"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if sort == 'price':
+        sql += " ORDER BY price IS NULL, price, templestay_id"
+    elif sort == '-price':
+        sql += " ORDER BY price IS NULL, price DESC, templestay_id"
+    else:
+        sql += " ORDER BY templestay_id"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
@@ -0,0 +1,47 @@
+import hashlib
+import re
+
+_WS_RE = re.compile(r'\s+')
+
+def normalize_text(text):
+    # 파서마다 문자열 사이 구분자가 달라도 같은 지문이 나오도록 공백을 모두 제거
+    return _WS_RE.sub('', text or '')
+
+def fingerprint(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(normalize_text(part if isinstance(part, str) else str(part or '')).encode('utf-8'))
+        h.update(b'\x1f')
+    return h.hexdigest()
+
+def detail_fingerprint(soup):
+    # 공백/스크립트 변화에는 영향을 받지 않도록 파싱에 쓰는 영역의 텍스트와 이미지 경로만 해시
+    parts = []
+    place_div = soup.find('div', class_='place')
+    parts.append(place_div.get_text(' ') if place_div else '')
+    for section in soup.find_all('div', class_='section'):
+        parts.append(section.get_text(' '))
+    for img in soup.find_all('img'):
+        src = img.get('src')
+        if src and 'templePrg' in src:
+            parts.append(src)
+    return fingerprint(*parts)
+
+def price_fingerprint(soup, schedule, address, *extra):
+    table = soup.select_one('div.table table')
+    return fingerprint(table.get_text(' ') if table else '', schedule, address, *extra)
+
+def ensure_hash_column(conn, table):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*) AS cnt FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'content_hash'
+        """, (table,))
+        row = cursor.fetchone()
+        count = row['cnt'] if isinstance(row, dict) else row[0]
+        if not count:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN content_hash CHAR(64) NULL")
+            conn.commit()
+    finally:
+        cursor.close()
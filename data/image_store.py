@@ -0,0 +1,250 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image
+
+from bulk import bulk_update
+from db import close_pool, get_connection
+from fetcher import create_session
+from metrics import metrics
+from throttle import PoliteSession
+
+logger = logging.getLogger(__name__)
+
+IMAGE_STORE_ROOT = 'image_store'
+THUMBNAIL_SIZE = (480, 480)
+
+IMAGE_COLUMNS = {
+    'sha256': 'CHAR(64) NULL',
+    'width': 'INT NULL',
+    'height': 'INT NULL',
+    'thumb_path': 'VARCHAR(255) NULL',
+}
+
+def ensure_image_columns(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'image'
+        """)
+        existing = {row[0] for row in cursor.fetchall()}
+        for column, ddl in IMAGE_COLUMNS.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE image ADD COLUMN {column} {ddl}")
+        conn.commit()
+    finally:
+        cursor.close()
+
+class ImageStore:
+    """SHA-256 기준으로 원본과 WebP 썸네일을 저장하는 저장소. URL별 ETag/해시는 SQLite 색인에 보관"""
+
+    def __init__(self, root=IMAGE_STORE_ROOT):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                ext TEXT NOT NULL,
+                width INTEGER,
+                height INTEGER,
+                thumb_path TEXT
+            )
+        """)
+
+    def blob_path(self, sha256, ext):
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256 + ext)
+
+    def thumb_path(self, sha256):
+        return os.path.join(self.root, 'thumbs', sha256[:2], sha256 + '.webp')
+
+    def lookup_url(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, etag, last_modified FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        return {'sha256': row[0], 'etag': row[1], 'last_modified': row[2]} if row else None
+
+    def remember_url(self, url, sha256, etag=None, last_modified=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO urls (url, sha256, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, sha256, etag, last_modified, time.time()),
+            )
+
+    def blob(self, sha256):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ext, width, height, thumb_path FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        return {'ext': row[0], 'width': row[1], 'height': row[2], 'thumb_path': row[3]} if row else None
+
+    def put_blob(self, content, ext):
+        # 같은 내용이면 이미 있는 파일을 그대로 공유
+        sha256 = hashlib.sha256(content).hexdigest()
+        if self.blob(sha256) is None:
+            path = self.blob_path(sha256, ext)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            # 같은 내용을 여러 스레드가 동시에 받아도 각자 다른 임시 파일에 쓰고 교체한다 (내용이 같으므로 누가 이겨도 됨)
+            if not os.path.exists(path):
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(content)
+                    os.chmod(tmp_path, 0o644)
+                    os.replace(tmp_path, path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            with self._lock:
+                self._conn.execute("INSERT OR IGNORE INTO blobs (sha256, ext) VALUES (?, ?)", (sha256, ext))
+        return sha256
+
+    def set_thumbnail(self, sha256, width, height, thumb_path):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE blobs SET width = ?, height = ?, thumb_path = ? WHERE sha256 = ?",
+                (width, height, thumb_path, sha256),
+            )
+
+def _extension(url, content_type):
+    ext = os.path.splitext(url.split('?', 1)[0])[1].lower()
+    if ext in ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'):
+        return ext
+    if content_type and '/' in content_type:
+        return '.' + content_type.split('/', 1)[1].split(';', 1)[0].strip()
+    return '.bin'
+
+def download_image(store, session, url, timeout=20):
+    # 반환: (url, sha256, 상태). 상태는 'not_modified' / 'downloaded' / 'error'
+    known = store.lookup_url(url)
+    headers = {}
+    if known and store.blob(known['sha256']):
+        if known['etag']:
+            headers['If-None-Match'] = known['etag']
+        if known['last_modified']:
+            headers['If-Modified-Since'] = known['last_modified']
+
+    try:
+        with metrics.time('fetch'):
+            res = session.get(url, headers=headers, timeout=timeout)
+            content = res.content
+        metrics.inc('bytes', len(content))
+        if res.status_code == 304 and headers:
+            return url, known['sha256'], 'not_modified'
+        res.raise_for_status()
+        sha256 = store.put_blob(content, _extension(url, res.headers.get('Content-Type')))
+        store.remember_url(url, sha256, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+        return url, sha256, 'downloaded'
+    except Exception as e:
+        logger.warning(f"이미지 다운로드 실패 ({url}): {e}")
+        return url, None, 'error'
+
+def make_thumbnail(src_path, dst_path, size=THUMBNAIL_SIZE):
+    # CPU 작업이므로 프로세스 풀에서 실행. 원본 크기를 돌려준다
+    with Image.open(src_path) as img:
+        width, height = img.size
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        img.thumbnail(size)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        img.save(dst_path, 'WEBP', quality=80, method=4)
+    return width, height
+
+def fetch_and_thumbnail(urls, store, session=None, download_workers=8, thumb_workers=None):
+    # 반환: {url: {'sha256', 'width', 'height', 'thumb_path'}} (실패한 URL은 제외)
+    session = session or PoliteSession(create_session(pool_size=download_workers))
+    stats = {'downloaded': 0, 'not_modified': 0, 'error': 0}
+
+    with ThreadPoolExecutor(max_workers=download_workers) as executor:
+        downloads = list(executor.map(lambda u: download_image(store, session, u), urls))
+
+    url_to_sha = {}
+    for url, sha256, status in downloads:
+        stats[status] += 1
+        if sha256:
+            url_to_sha[url] = sha256
+
+    # 썸네일이 아직 없는 해시만 처리 (같은 이미지는 한 번만)
+    pending = {}
+    for sha256 in set(url_to_sha.values()):
+        blob = store.blob(sha256)
+        if blob and not blob['thumb_path']:
+            pending[sha256] = (store.blob_path(sha256, blob['ext']), store.thumb_path(sha256))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=thumb_workers) as executor:
+            futures = {sha256: executor.submit(make_thumbnail, src, dst) for sha256, (src, dst) in pending.items()}
+            for sha256, future in futures.items():
+                try:
+                    width, height = future.result()
+                    store.set_thumbnail(sha256, width, height, pending[sha256][1])
+                except Exception as e:
+                    logger.warning(f"썸네일 생성 실패 ({sha256}): {e}")
+
+    results = {}
+    for url, sha256 in url_to_sha.items():
+        blob = store.blob(sha256)
+        if blob and blob['thumb_path']:
+            results[url] = {'sha256': sha256, 'width': blob['width'], 'height': blob['height'],
+                            'thumb_path': os.path.relpath(blob['thumb_path'], store.root).replace(os.sep, '/')}
+    logger.info(f"이미지 처리: 다운로드 {stats['downloaded']}건, 변경 없음 {stats['not_modified']}건, "
+                f"실패 {stats['error']}건, 썸네일 생성 {len(pending)}건")
+    return results
+
+def process_images(conn, store=None, refresh=False, download_workers=8, thumb_workers=None):
+    """image 테이블의 이미지를 내려받아 썸네일을 만들고 해시/크기/썸네일 경로를 기록"""
+    store = store or ImageStore()
+    ensure_image_columns(conn)
+
+    cursor = conn.cursor()
+    try:
+        where = "" if refresh else "WHERE sha256 IS NULL"
+        cursor.execute(f"SELECT id, img_url FROM image {where} ORDER BY id")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    if not rows:
+        logger.info("처리할 이미지가 없습니다.")
+        return 0
+
+    results = fetch_and_thumbnail(sorted({url for _, url in rows}), store,
+                                  download_workers=download_workers, thumb_workers=thumb_workers)
+    updates = [
+        (r['sha256'], r['width'], r['height'], r['thumb_path'], image_id)
+        for image_id, url in rows
+        if (r := results.get(url))
+    ]
+    return bulk_update(conn, "image", "id", ("sha256", "width", "height", "thumb_path"), updates,
+                       name="이미지 메타데이터")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    conn = get_connection()
+    try:
+        process_images(conn)
+    finally:
+        conn.close()
+        close_pool()
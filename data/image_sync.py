@@ -0,0 +1,82 @@
+import logging
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bulk import bulk_insert_images
+
+logger = logging.getLogger(__name__)
+
+IMAGE_BASE_URL = 'https://www.templestay.com/'
+
+# 캐시 무효화 용도로만 붙는 쿼리 파라미터
+QUERY_NOISE = {'v', 'ver', 'version', 't', 'ts', 'timestamp', '_', 'cache', 'dummy'}
+
+def normalize_image_url(src):
+    # 절대 경로로 바꾸고, 의미 없는 쿼리와 fragment를 제거
+    parts = urlsplit(urljoin(IMAGE_BASE_URL, src.strip()))
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in QUERY_NOISE)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+def dedupe_image_urls(urls):
+    return list(dict.fromkeys(normalize_image_url(u) for u in urls))
+
+def diff_images(desired, stored):
+    # desired: {templestay_id: [url, ...]}, stored: [(image_id, templestay_id, img_url), ...]
+    # 반환: (추가할 (templestay_id, url) 목록, 삭제할 image id 목록)
+    kept = set()
+    to_delete = []
+    for image_id, templestay_id, img_url in stored:
+        key = (templestay_id, normalize_image_url(img_url))
+        if key[1] in desired.get(templestay_id, ()) and key not in kept:
+            kept.add(key)
+        else:
+            # 더 이상 페이지에 없거나, 같은 이미지가 중복 저장된 행
+            to_delete.append(image_id)
+
+    to_insert = [
+        (templestay_id, url)
+        for templestay_id, urls in desired.items()
+        for url in urls
+        if (templestay_id, url) not in kept
+    ]
+    return to_insert, to_delete
+
+def fetch_stored_images(cursor, templestay_ids, chunk_size=1000):
+    rows = []
+    for i in range(0, len(templestay_ids), chunk_size):
+        chunk = templestay_ids[i:i + chunk_size]
+        cursor.execute(
+            f"SELECT id, templestay_id, img_url FROM image WHERE templestay_id IN ({','.join(['%s'] * len(chunk))})",
+            tuple(chunk),
+        )
+        rows.extend(tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in cursor.fetchall())
+    return rows
+
+def delete_images(cursor, image_ids, chunk_size=1000):
+    for i in range(0, len(image_ids), chunk_size):
+        chunk = image_ids[i:i + chunk_size]
+        cursor.execute(f"DELETE FROM image WHERE id IN ({','.join(['%s'] * len(chunk))})", tuple(chunk))
+
+def sync_images(conn, records):
+    # records: [(templestay_id, [url, ...]), ...]. 바뀐 부분(추가/삭제)만 DB에 쓴다
+    desired = {}
+    for templestay_id, urls in records:
+        desired[templestay_id] = set(dedupe_image_urls(urls))
+    if not desired:
+        return 0, 0
+
+    # 삭제와 추가를 한 트랜잭션으로: 추가가 실패하면 삭제도 되돌려 기존 이미지를 잃지 않는다
+    cursor = conn.cursor()
+    try:
+        stored = fetch_stored_images(cursor, list(desired))
+        to_insert, to_delete = diff_images(desired, stored)
+        delete_images(cursor, to_delete)
+        inserted = bulk_insert_images(conn, to_insert, commit=False) if to_insert else 0
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    logger.info(f"이미지 동기화: templestay {len(desired)}개, 추가 {len(to_insert)}건, 삭제 {len(to_delete)}건")
+    return inserted, len(to_delete)
@@ -0,0 +1,77 @@
+import re
+
+class KeywordMatcher:
+    """키워드→비트 사전을 미리 컴파일해 텍스트를 한 번만 훑어 비트마스크를 만드는 다중 패턴 매처.
+
+    모든 표기(surface)를 접두사 트라이로 합친 정규식 하나로 컴파일하므로 위치마다 비교하는
+    비용이 키워드 수와 거의 무관하다. Aho-Corasick의 출력 함수처럼 각 표기에는 그 안에 포함된
+    다른 키워드의 비트까지 미리 합쳐 두어, 가장 긴 일치만 찾아도 포함된 키워드가 빠지지 않는다."""
+
+    def __init__(self, keyword_bits, aliases=None):
+        aliases = aliases or {}
+        patterns = {}
+        for keyword, bit in keyword_bits.items():
+            surfaces = {keyword, *aliases.get(keyword, ())}
+            surfaces |= {s.replace(' ', '') for s in surfaces}
+            for surface in surfaces:
+                patterns[surface] = patterns.get(surface, 0) | bit
+
+        self.bits = {
+            surface: _or_bits(bits for other, bits in patterns.items() if other in surface)
+            for surface in patterns
+        }
+        alternation = _trie_pattern(patterns)
+        if _has_partial_overlap(patterns):
+            # 한 패턴의 끝과 다른 패턴의 시작이 겹치면 모든 위치에서 시도 (lookahead)
+            self._regex = re.compile(f'(?=({alternation}))')
+        else:
+            self._regex = re.compile(f'({alternation})')
+
+    def match_bits(self, text):
+        if not text:
+            return 0
+        bits = 0
+        for surface in set(self._regex.findall(text)):
+            bits |= self.bits[surface]
+        return bits
+
+    def first_match(self, text):
+        # 가장 앞에서 일치한 키워드의 비트 (dict 순서가 아니라 텍스트 위치 기준)
+        if not text:
+            return 0
+        match = self._regex.search(text)
+        return self.bits[match.group(1)] if match else 0
+
+def _trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    return _trie_node_pattern(trie)
+
+def _trie_node_pattern(node):
+    # 더 긴 표기를 먼저 시도하도록 자식 분기를 만든 뒤, 여기서 끝나는 단어가 있으면 선택적으로 만든다
+    branches = [re.escape(ch) + _trie_node_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        return f'(?:{body})?'
+    return body
+
+def _or_bits(values):
+    result = 0
+    for value in values:
+        result |= value
+    return result
+
+def _has_partial_overlap(patterns):
+    for p in patterns:
+        for q in patterns:
+            if p == q or p in q or q in p:
+                continue
+            if any(p[-k:] == q[:k] for k in range(1, min(len(p), len(q)))):
+                return True
+    return False
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get("CRAWL_METRICS_DIR", "metrics")
+
+# 초 단위 버킷 (목록 페이지 요청 ~ Selenium 렌더링/대량 쓰기까지)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 단계: fetch, browser_render, parse, db_write
+# 카운터: pages(페이지당 한 번, 캐시/전략과 무관), retries, bytes, rows_written, cache_hits, cache_misses
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        # 버킷 상한으로 근사 (마지막 버킷은 최댓값)
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+class Metrics:
+    """단계별 소요 시간 히스토그램과 카운터. 실행이 끝나면 Prometheus 텍스트/JSON 리포트로 저장"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def report(self, job=None):
+        with self._lock:
+            return {
+                "job": job,
+                "started": self.started,
+                "elapsed": time.time() - self.started,
+                "stages": {
+                    stage: {
+                        "count": h.count,
+                        "sum": round(h.sum, 6),
+                        "mean": round(h.sum / h.count, 6) if h.count else 0.0,
+                        "p50": h.quantile(0.5),
+                        "p95": h.quantile(0.95),
+                        "max": round(h.max, 6),
+                    }
+                    for stage, h in self.histograms.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def prometheus(self, job=None):
+        job_label = f'job="{job}",' if job else ""
+        lines = [
+            "# HELP crawl_stage_seconds Time spent per crawl stage",
+            "# TYPE crawl_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                labels = f'{job_label}stage="{stage}"'
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'crawl_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'crawl_stage_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"crawl_stage_seconds_sum{{{labels}}} {h.sum:.6f}")
+                lines.append(f"crawl_stage_seconds_count{{{labels}}} {h.count}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE crawl_{name}_total counter")
+                lines.append(f"crawl_{name}_total{{{job_label.rstrip(',')}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, job, directory=None):
+        # <job>.prom은 node_exporter textfile collector에서 그대로 읽을 수 있다
+        directory = directory or METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        prom_path = os.path.join(directory, f"{job}.prom")
+        json_path = os.path.join(directory, f"{job}.json")
+        for path, content in (
+            (prom_path, self.prometheus(job)),
+            (json_path, json.dumps(self.report(job), ensure_ascii=False, indent=2)),
+        ):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return prom_path, json_path
+
+    def summary(self):
+        report = self.report()
+        stages = ", ".join(
+            f"{stage} {s['count']}회 평균 {s['mean'] * 1000:.0f}ms p95 {s['p95'] * 1000:.0f}ms"
+            for stage, s in report["stages"].items()
+        )
+        counters = ", ".join(f"{name} {value}" for name, value in report["counters"].items())
+        return f"{stages} | {counters}"
+
+metrics = Metrics()
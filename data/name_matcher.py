@@ -0,0 +1,101 @@
+import csv
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+
+PAREN_RE = re.compile(r'\([^)]*\)')
+HANJA_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]')
+SPACE_RE = re.compile(r'\s+')
+# '조계사 서울분원'처럼 사찰명 뒤에 붙은 지역 분원/포교당 표기
+BRANCH_RE = re.compile(r'(?<=사)\w{0,4}(분원|지부|포교당)$')
+
+def canonical_name(name):
+    # 괄호 안 설명(한자 표기/본사 등), 남은 한자, 공백, 분원 표기, 끝의 '사'를 떼어 비교용 키로 만든다
+    if not isinstance(name, str):
+        return ""
+    name = name.replace('（', '(').replace('）', ')').replace('\xa0', ' ')
+    name = PAREN_RE.sub('', name)
+    name = HANJA_RE.sub('', name)
+    name = SPACE_RE.sub('', name)
+    name = BRANCH_RE.sub('', name)
+    if len(name) > 1 and name.endswith('사'):
+        name = name[:-1]
+    return name
+
+def jamo_ngrams(text, n=2):
+    # 한글 음절을 자모로 풀어서(NFD) n-gram을 만든다. 받침 하나 차이도 일부 n-gram만 달라진다
+    # 사찰명은 두세 글자라 3-gram이면 오타 한 글자에 점수가 크게 떨어져 2-gram을 기본으로 쓴다
+    jamo = '^' + unicodedata.normalize('NFD', text) + '$'
+    if len(jamo) <= n:
+        return {jamo}
+    return {jamo[i:i + n] for i in range(len(jamo) - n + 1)}
+
+class NameMatcher:
+    """DB 사찰명에 대한 자모 n-gram 역색인. 질의와 n-gram을 공유하는 이름만 점수를 매겨 top-k를 돌려준다"""
+
+    def __init__(self, name_to_ids, n=2):
+        # name_to_ids: {DB 사찰명(정규화된 값): [templestay_id, ...]}
+        self.n = n
+        self.names = []
+        self.ids = []
+        self.gram_counts = []
+        self.by_key = defaultdict(list)
+        self.postings = defaultdict(list)
+
+        for name, ids in name_to_ids.items():
+            if not name:
+                continue
+            key = canonical_name(name)
+            grams = jamo_ngrams(key, n)
+            index = len(self.names)
+            self.names.append(name)
+            self.ids.append(list(ids))
+            self.gram_counts.append(len(grams))
+            self.by_key[key].append(index)
+            for gram in grams:
+                self.postings[gram].append(index)
+
+    def candidates(self, name, k=5):
+        """반환: [(점수, DB 사찰명, [id, ...]), ...] 점수 내림차순. 점수는 n-gram Dice 계수(0~1)"""
+        key = canonical_name(name)
+        if not key:
+            return []
+        exact = self.by_key.get(key)
+        if exact:
+            return [(1.0, self.names[i], self.ids[i]) for i in exact][:k]
+
+        grams = jamo_ngrams(key, self.n)
+        shared = defaultdict(int)
+        for gram in grams:
+            for index in self.postings.get(gram, ()):
+                shared[index] += 1
+
+        size = len(grams)
+        top = heapq.nlargest(
+            k, shared.items(),
+            key=lambda item: 2 * item[1] / (size + self.gram_counts[item[0]]),
+        )
+        return [(2 * common / (size + self.gram_counts[i]), self.names[i], self.ids[i]) for i, common in top]
+
+    def match(self, name, threshold=0.75, margin=0.05):
+        """반환: (상태, DB 사찰명, ids, 점수). 상태는 'exact' / 'fuzzy' / 'ambiguous' / 'unmatched'"""
+        found = self.candidates(name, k=2)
+        if not found or found[0][0] < threshold:
+            best = found[0] if found else (0.0, None, [])
+            return 'unmatched', best[1], [], best[0]
+
+        score, db_name, ids = found[0]
+        # 2위도 기준을 넘고 1위와 차이가 margin 이내면 어느 쪽인지 확신할 수 없다
+        if len(found) > 1 and found[1][0] >= threshold and score - found[1][0] <= margin:
+            return 'ambiguous', db_name, [], score
+        return ('exact' if score == 1.0 else 'fuzzy'), db_name, ids, score
+
+REPORT_FIELDS = ['csv_name', 'status', 'db_name', 'score', 'candidates']
+
+def write_match_report(path, rows):
+    # rows: [(csv_name, status, db_name, score, candidates), ...] - 미일치/모호한 이름 확인용
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_FIELDS)
+        writer.writerows(rows)
@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+from metrics import metrics
+
+PAGE_CACHE_PATH = 'page_cache.sqlite'
+PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+class PageCache:
+    """URL별 응답 본문과 ETag/Last-Modified를 저장하는 디스크 캐시 (용량 초과 시 LRU 삭제)"""
+
+    def __init__(self, path=PAGE_CACHE_PATH, max_bytes=PAGE_CACHE_MAX_BYTES, fresh_for=0):
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+        self.stats = {'fresh': 0, 'revalidated': 0, 'fetched': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages (last_access)")
+        self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return {
+            'body': zlib.decompress(body).decode('utf-8'),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+        }
+
+    def is_fresh(self, entry):
+        return self.fresh_for > 0 and time.time() - entry['fetched_at'] < self.fresh_for
+
+    def request_headers(self, entry):
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, url, revalidated=False):
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._conn.execute(
+                    "UPDATE pages SET last_access = ?, fetched_at = ? WHERE url = ?", (now, now, url)
+                )
+            else:
+                self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, url))
+
+    def store(self, url, text, etag=None, last_modified=None):
+        body = zlib.compress(text.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, len(body)),
+            )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # 가장 오래 사용하지 않은 항목부터 지워 용량의 90% 아래로 맞춘다
+        target = self.max_bytes * 0.9
+        victims = []
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY last_access"):
+            if self.total_bytes <= target:
+                break
+            victims.append((url,))
+            self.total_bytes -= size
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", victims)
+
+    def record(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+        metrics.inc('cache_misses' if outcome == 'fetched' else 'cache_hits')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+def get_page_cache():
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+        return _page_cache
+
+def fetch_cached(session, url, cache=None, timeout=10):
+    cache = cache or get_page_cache()
+    entry = cache.get(url)
+    if entry and cache.is_fresh(entry):
+        cache.touch(url)
+        cache.record('fresh')
+        return entry['body']
+
+    with metrics.time('fetch'):
+        res = session.get(url, headers=cache.request_headers(entry), timeout=timeout)
+        body = res.content
+    metrics.inc('bytes', len(body))
+    if res.status_code == 304 and entry:
+        cache.touch(url, revalidated=True)
+        cache.record('revalidated')
+        return entry['body']
+
+    res.raise_for_status()
+    text = res.text
+    cache.store(url, text, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+    cache.record('fetched')
+    return text
+
+async def fetch_cached_async(session, url, cache=None):
+    cache = cache or get_page_cache()
+    entry = cache.get(url)
+    if entry and cache.is_fresh(entry):
+        cache.touch(url)
+        cache.record('fresh')
+        return entry['body']
+
+    started = time.perf_counter()
+    async with session.get(url, headers=cache.request_headers(entry)) as res:
+        # PoliteAsyncSession이 본문까지 읽은 뒤 돌려주므로 여기까지가 요청 시간
+        metrics.observe('fetch', time.perf_counter() - started)
+        if res.status == 304 and entry:
+            cache.touch(url, revalidated=True)
+            cache.record('revalidated')
+            return entry['body']
+
+        res.raise_for_status()
+        text = await res.text()
+        metrics.inc('bytes', res.content_length or len(text.encode('utf-8')))
+        cache.store(url, text, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+    cache.record('fetched')
+    return text
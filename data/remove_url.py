@@ -1,68 +1,130 @@
-import pickle
+import argparse
+import hashlib
 import os
-import mysql.connector
-import yaml
 
-def load_db_config(file_path):
-    with open(file_path, "r", encoding="utf-8") as file:
-        config = yaml.safe_load(file)
-        return config.get("database")
+from db import close_pool, get_connection
+from metrics import metrics
+from url_index import URL_INDEX_PATH, UrlIndex
 
-def get_connection(config):
-    try:
-        return mysql.connector.connect(
-            host=config["host"],
-            user=config["user"],
-            password=config["password"],
-            database=config["database"]
-        )
-    except mysql.connector.Error as e:
-        print(f"DB 연결 오류: {e}")
-        return None
+STAGE_CHUNK_SIZE = 1000
+DELETE_BATCH_SIZE = 500
+
+def url_hash(url):
+    return hashlib.sha256(url.encode("utf-8")).digest()
+
+def stage_current_urls(cursor, current_urls, chunk_size=STAGE_CHUNK_SIZE):
+    # URL 대신 SHA-256을 기본 키로 넣어 URL 길이/콜레이션과 상관없이 인덱스로 비교
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS current_url")
+    cursor.execute("CREATE TEMPORARY TABLE current_url (url_hash BINARY(32) NOT NULL PRIMARY KEY)")
+    staged = 0
+    chunk = []
+    for url in current_urls:
+        chunk.append(url_hash(url))
+        if len(chunk) >= chunk_size:
+            staged += _insert_hashes(cursor, chunk)
+            chunk = []
+    if chunk:
+        staged += _insert_hashes(cursor, chunk)
+    return staged
 
-def load_url_cache():
-    if os.path.exists('url_cache.pkl'):
-        with open('url_cache.pkl', 'rb') as f:
-            return pickle.load(f)
-    return set()
+def _insert_hashes(cursor, hashes):
+    cursor.execute(
+        f"INSERT IGNORE INTO current_url (url_hash) VALUES {', '.join(['(%s)'] * len(hashes))}",
+        hashes,
+    )
+    return len(hashes)
 
-def delete_removed_urls(conn, current_urls):
-    cursor = conn.cursor(dictionary=True)
+REMOVED_IDS_SQL = """
+    SELECT t.id FROM templestay t
+    LEFT JOIN current_url c ON c.url_hash = UNHEX(SHA2(t.url, 256))
+    WHERE c.url_hash IS NULL AND t.id > %s
+    ORDER BY t.id
+    LIMIT %s
+"""
+
+def count_removed(cursor):
+    cursor.execute("""
+        SELECT COUNT(*) FROM templestay t
+        LEFT JOIN current_url c ON c.url_hash = UNHEX(SHA2(t.url, 256))
+        WHERE c.url_hash IS NULL
+    """)
+    return cursor.fetchone()[0]
+
+def delete_removed_urls(conn, current_urls, dry_run=False, batch_size=DELETE_BATCH_SIZE):
+    """현재 URL 집합에 없는 templestay를 filter/image와 함께 batch_size개씩 삭제. 삭제(예정) 건수 반환"""
+    cursor = conn.cursor()
     try:
-        cursor.execute("SELECT id, url FROM templestay")
-        db_rows = cursor.fetchall()
+        staged = stage_current_urls(cursor, current_urls)
+        if not staged:
+            # URL 캐시가 비어 있으면 전체 삭제가 되므로 중단
+            print(">> 현재 URL 목록이 비어 있어 삭제를 건너뜁니다.")
+            return 0
 
-        removed_ids = [
-            row["id"] for row in db_rows
-            if row["url"] not in current_urls
-        ]
+        removed = count_removed(cursor)
+        print(f">> 현재 URL {staged}건, 삭제 대상 {removed}건")
+        if dry_run or not removed:
+            if not removed:
+                print(">> 삭제할 URL이 없습니다.")
+            return removed
 
-        if removed_ids:
-            format_ids = ",".join(map(str, removed_ids))
-            print(f">> 삭제된 항목 {len(removed_ids)}건 templestay, filter에서 삭제 중...")
+        deleted = 0
+        last_id = 0
+        while True:
+            select = conn.prepared(REMOVED_IDS_SQL)
+            select.execute(REMOVED_IDS_SQL, (last_id, batch_size))
+            ids = [row[0] for row in select.fetchall()]
+            if not ids:
+                break
 
-            cursor.execute(f"DELETE FROM filter WHERE templestay_id IN ({format_ids})")
-            cursor.execute(f"DELETE FROM templestay WHERE id IN ({format_ids})")
+            placeholders = ", ".join(["%s"] * len(ids))
+            with metrics.time('db_write'):
+                cursor.execute(f"DELETE FROM filter WHERE templestay_id IN ({placeholders})", ids)
+                cursor.execute(f"DELETE FROM image WHERE templestay_id IN ({placeholders})", ids)
+                cursor.execute(f"DELETE FROM templestay WHERE id IN ({placeholders})", ids)
+                conn.commit()
+            metrics.inc('rows_written', len(ids))
+            deleted += len(ids)
+            last_id = ids[-1]
+            print(f">> {deleted}/{removed}건 templestay, filter, image에서 삭제")
 
-            conn.commit()
-        else:
-            print(">> 삭제할 URL이 없습니다.")
+        return deleted
 
     except Exception as e:
         print(f"삭제 작업 중 오류: {e}")
         conn.rollback()
+        return 0
     finally:
-        cursor.close()
+        try:
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS current_url")
+        finally:
+            cursor.close()
 
 if __name__ == "__main__":
-    db_config_path = "C:\\jeolloga-crawling\\data\\db_config.yaml"
-    db_config = load_db_config(db_config_path)
+    parser = argparse.ArgumentParser(description="목록에서 사라진 templestay 삭제")
+    parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상 건수만 출력")
+    parser.add_argument("--batch-size", type=int, default=DELETE_BATCH_SIZE, help="한 번에 삭제할 templestay 수")
+    args = parser.parse_args()
 
-    conn = get_connection(db_config)
-    if not conn:
+    try:
+        conn = get_connection()
+    except Exception as e:
+        print(f"DB 연결 오류: {e}")
         print("DB 연결 실패")
         exit()
 
-    url_cache = load_url_cache()
-    delete_removed_urls(conn, url_cache)
-    conn.close()
\ No newline at end of file
+    if not os.path.exists(URL_INDEX_PATH):
+        print("URL 색인이 없습니다. url_type.py를 먼저 실행하세요.")
+        conn.close()
+        close_pool()
+        exit()
+
+    # 읽기 전용으로 열어 url_type이 실행 중이어도 안전하게 읽고, URL은 스트리밍으로 넘긴다
+    url_index = UrlIndex(readonly=True)
+    try:
+        delete_removed_urls(conn, url_index.urls(), dry_run=args.dry_run, batch_size=args.batch_size)
+    finally:
+        url_index.close()
+        conn.close()
+        close_pool()
+    print(f"단계별 측정: {metrics.summary()}")
+    metrics.write_report('remove_url')
\ No newline at end of file
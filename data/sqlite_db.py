@@ -0,0 +1,102 @@
+import re
+import sqlite3
+
+# 벤치마크용 mysql.connector 대용 연결. 운영 코드(bulk/image_sync 등)가 보내는 MySQL 문장을
+# SQLite 문법으로 옮겨 실행해, 쓰기 경로를 실제 함수 그대로 돌려볼 수 있게 한다
+
+UPDATE_JOIN_RE = re.compile(r"UPDATE\s+(\w+)\s+(\w+)\s+JOIN\s+(\w+)\s+(\w+)\s+ON\s+(.+?)\s+SET\s+(.+)$", re.S)
+SET_TARGET_RE = re.compile(r"(^|,)\s*\w+\.(\w+)\s*=")
+DUPLICATE_RE = re.compile(r"ON DUPLICATE KEY UPDATE\s+(.+)$", re.S)
+VALUES_RE = re.compile(r"VALUES\((\w+)\)")
+
+def translate(sql):
+    sql = sql.strip().replace("%s", "?")
+    sql = sql.replace("INSERT IGNORE", "INSERT OR IGNORE").replace("NOW()", "CURRENT_TIMESTAMP")
+    sql = sql.replace("DROP TEMPORARY TABLE", "DROP TABLE").replace("CREATE TEMPORARY TABLE", "CREATE TEMP TABLE")
+
+    # UPDATE t JOIN s ON ... SET t.c = ... → UPDATE t SET c = ... FROM s WHERE ...
+    match = UPDATE_JOIN_RE.match(sql)
+    if match:
+        table, alias, source, source_alias, on, assignments = match.groups()
+        assignments = SET_TARGET_RE.sub(r"\1 \2 =", assignments)
+        return f"UPDATE {table} AS {alias} SET {assignments} FROM {source} AS {source_alias} WHERE {on}"
+
+    # INSERT ... SELECT ... ON DUPLICATE KEY UPDATE c = VALUES(c) → ON CONFLICT DO UPDATE SET c = excluded.c
+    match = DUPLICATE_RE.search(sql)
+    if match:
+        head = sql[:match.start()].rstrip()
+        if " WHERE " not in head.upper():
+            # SELECT 뒤에 ON CONFLICT가 오면 WHERE가 있어야 SQLite가 JOIN ON과 구분한다
+            head += " WHERE true"
+        assignments = VALUES_RE.sub(r"excluded.\1", match.group(1))
+        return f"{head} ON CONFLICT DO UPDATE SET {assignments}"
+    return sql
+
+class SqliteCursor:
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self.dictionary = dictionary
+
+    def execute(self, operation, params=None):
+        self._cursor.execute(translate(operation), tuple(params or ()))
+
+    def executemany(self, operation, seq_params):
+        self._cursor.executemany(translate(operation), [tuple(p) for p in seq_params])
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return dict(zip((d[0] for d in self._cursor.description), row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._cursor.close()
+
+class SqliteConnection:
+    """mysql.connector 연결에서 db.ConnectionPool이 쓰는 부분만 흉내 낸 SQLite 연결"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self.autocommit = False
+
+    def cursor(self, prepared=False, dictionary=False, buffered=False):
+        return SqliteCursor(self._conn, dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def ping(self, reconnect=True, attempts=1):
+        self._conn.execute("SELECT 1")
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+def sqlite_connector(path):
+    # db.init_pool(connect=...)에 넘기는 연결 생성 함수 (설정 값은 무시)
+    return lambda **config: SqliteConnection(path)
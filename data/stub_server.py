@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+LIST_PATH = "/fe/MI000000000000000062/templestay/prgList.do"
+DETAIL_PATH = "/fe/MI000000000000000062/reserve/view.do"
+
+def render_listing_page(page, items_per_page=10):
+    cates = ["당일형", "휴식형", "체험형"]
+    lis = []
+    for i in range(items_per_page):
+        seq = page * 1000 + i
+        cate = cates[i % len(cates)]
+        lis.append(
+            f"<li><div class=\"txt\"><strong onclick=\"fncReserve('{seq}', 'TB_{seq}')\">프로그램 {seq}</strong>"
+            f"<span class=\"cate1\">{cate}</span></div></li>"
+        )
+    return (
+        "<html><body><div class=\"myplace_list\"><ul>"
+        + "".join(lis)
+        + "</ul></div></body></html>"
+    )
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 따로 쓰므로 Nagle을 끄지 않으면 keep-alive 요청마다 delayed ACK(~40ms)가 붙는다
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        parts = urlsplit(self.path)
+        if parts.path == LIST_PATH:
+            page = int(parse_qs(parts.query).get("pageIndex", ["1"])[0])
+            items = server.items_per_page if page <= server.total_pages else 0
+            body = render_listing_page(page, items).encode("utf-8")
+        elif parts.path == DETAIL_PATH and server.detail_html:
+            body = server.detail_html.encode("utf-8")
+        else:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+        with server.lock:
+            server.hits += 1
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def run_stub_server(total_pages=30, items_per_page=10, latency=0.1, detail_html=None):
+    """templestay.com 목록 페이지(와 detail_html이 있으면 상세 페이지)를 흉내내는 로컬 HTTP 서버"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.total_pages = total_pages
+    server.items_per_page = items_per_page
+    server.latency = latency
+    server.detail_html = detail_html
+    server.hits = 0
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        server.base_url = f"http://{host}:{port}"
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    disable_nagle_algorithm = True
+
+    # SimpleHTTPRequestHandler는 Last-Modified / If-Modified-Since(304)를 그대로 지원
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def run_static_server(directory):
+    """이미지 등 정적 파일을 내려주는 로컬 HTTP 서버"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(StaticHandler, directory=directory))
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        server.base_url = f"http://{host}:{port}"
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,21 +1,25 @@
-import re
-import json
-import time
 import logging
-import yaml
 import os
 
-from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import lru_cache
+from functools import partial
 
-from bs4 import BeautifulSoup
-import mysql.connector
-from mysql.connector.pooling import MySQLConnectionPool
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+from driver_pool import DriverPool, resolve_chromedriver_path
+from bulk import bulk_stats, bulk_update_templestay
+from crawl_state import CrawlJournal
+from db import close_pool, get_connection, init_pool
+from detail_parser import EMPTY_DETAILS, UNCHANGED, parse_detail_page
+from fingerprint import ensure_hash_column
+from image_sync import sync_images
+from metrics import metrics
+from fetcher import BrowserStrategy, FallbackFetcher, FetchStats, HttpStrategy, ProcessParser, create_session
+from page_cache import get_page_cache
+from throttle import PoliteSession
+from writer import StreamingWriter
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,43 +28,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-CONFIG_PATH = 'C:\\jeolloga-crawling\\data\\db_config.yaml'
-
-def load_config(path=CONFIG_PATH):
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Config file not found: {path}")
-    with open(path, 'r', encoding='utf-8') as file:
-        return yaml.safe_load(file)
-
-config = load_config()
-DB_CONFIG = config['database']
+driver_pool = None
 
-connection_pool = None
+parse_pool = None
 
-def init_connection_pool():
-    global connection_pool
-    try:
-        connection_pool = MySQLConnectionPool(**DB_CONFIG)
-        print("데이터베이스 연결 풀 생성 완료")
-    except mysql.connector.Error as err:
-        print(f"상세 오류: {type(err)} - {str(err)}")
-        raise
-
-def get_connection():
-    global connection_pool
-    if connection_pool is None:
-        init_connection_pool()
-    try:
-        return connection_pool.get_connection()
-    except mysql.connector.Error as err:
-        print(f"연결 풀에서 연결 가져오기 실패: {err}")
-        print("직접 데이터베이스 연결 시도 중...")
-        return mysql.connector.connect(
-            host=DB_CONFIG['host'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            database=DB_CONFIG['database']
-        )
+http_session = PoliteSession(create_session())
+fetch_stats = FetchStats()
 
 def create_driver(headless=True):
     options = Options()
@@ -73,185 +46,86 @@ def create_driver(headless=True):
     options.add_argument('--blink-settings=imagesEnabled=false')
     options.add_argument('--disk-cache-size=52428800')
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(resolve_chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     driver.set_window_size(1024, 768)
     driver.set_page_load_timeout(20)
     return driver
 
-@lru_cache(maxsize=100)
-def extract_phone_number(phone_text):
-    phone_pattern = re.compile(r'[\d\- /]+')
-    match = phone_pattern.search(phone_text)
-    if not match:
+def init_driver_pool(size, warm=0, max_pages=200, max_memory_mb=1024):
+    global driver_pool
+    driver_pool = DriverPool(create_driver, size, max_pages=max_pages, max_memory_mb=max_memory_mb)
+    if warm:
+        driver_pool.warm(warm)
+    return driver_pool
+
+def get_driver_pool():
+    if driver_pool is None:
+        init_driver_pool(1)
+    return driver_pool
+
+def init_parse_pool(workers=None):
+    # 0이면 페치 스레드에서 직접 파싱
+    global parse_pool
+    parse_pool = ProcessParser(parse_detail_page, workers) if workers != 0 else None
+    return parse_pool
+
+def get_parser(known_hash=None):
+    # known_hash를 넘기면 해시가 같은 페이지는 필드 추출 없이 UNCHANGED
+    parser = parse_pool if parse_pool is not None else parse_detail_page
+    return partial(parser, known_hash=known_hash) if known_hash else parser
+
+def create_detail_fetcher():
+    # 정적 HTML로 먼저 시도하고, place div가 없을 때만 Selenium으로 렌더링
+    browser = BrowserStrategy(get_driver_pool(), http_session.limiter)
+    return FallbackFetcher([HttpStrategy(http_session), browser], fetch_stats)
+
+class CrawlError(Exception):
+    pass
+
+def fetch_templestay_details(url, fetcher, known_hash=None):
+    # 실패 시 예외를 그대로 올려 호출 측에서 오류 내용을 기록할 수 있게 한다
+    logger.info(f"크롤링 시작: {url}")
+    details, strategy = fetcher.fetch(url, get_parser(known_hash))
+    if details is None:
+        raise CrawlError("place div 없음")
+
+    if details == UNCHANGED:
+        logger.info(f"변경 없음, 건너뜀: {url}")
         return None
-    phone = match.group().strip()
-    if '/' in phone:
-        phone = phone.split('/')[-1].strip()
-    return phone
-
-def extract_image_urls(soup):
-    """이미지 URL들을 추출하는 함수"""
-    image_urls = []
-    
-    # swiper-slide 내의 이미지들 추출
-    swiper_slides = soup.find_all('div', class_='swiper-slide')
-    for slide in swiper_slides:
-        img = slide.find('img')
-        if img and img.get('src'):
-            src = img.get('src')
-            # 상대 경로를 절대 경로로 변환
-            if src.startswith('/'):
-                src = 'https://www.templestay.com' + src
-            image_urls.append(src)
-    
-    img_tags = soup.find_all('img')
-    for img in img_tags:
-        src = img.get('src')
-        if src and 'templePrg' in src:
-            if src.startswith('/'):
-                src = 'https://www.templestay.com' + src
-            if src not in image_urls:
-                image_urls.append(src)
-    
-    return image_urls
 
-def parse_program_schedule(html): 
-    soup = BeautifulSoup(html, 'html.parser')
-    table = soup.find('table')
-    if not table:
-        return None
+    logger.info(f"크롤링 완료 [{strategy}]: {details[0]} ({details[1]}), 이미지 {len(details[6])}개")
+    return details
 
-    schedule_dict = OrderedDict()
-    current_day = None
-
-    for row in table.find_all('tr')[1:]:
-        cols = row.find_all('td')
-
-        if len(cols) == 3:
-            day_cell = cols[0].get_text(strip=True)
-            time_cell = cols[1].get_text(strip=True)
-            activity_cell = cols[2].get_text(strip=True)
-
-            if day_cell:
-                current_day = day_cell.replace(" ", "")
-                if current_day not in schedule_dict:
-                    schedule_dict[current_day] = OrderedDict()
-
-            if current_day:
-                schedule_dict[current_day][time_cell] = activity_cell
-
-        elif len(cols) == 2 and current_day:
-            time_cell = cols[0].get_text(strip=True)
-            activity_cell = cols[1].get_text(strip=True)
-            schedule_dict[current_day][time_cell] = activity_cell
-
-    return json.dumps(schedule_dict, ensure_ascii=False, separators=(',', ':'))
-
-def extract_introduction_text(soup):
-    program_sections = []
-    for section in soup.find_all('div', class_='section'):
-        h4 = section.find('h4')
-        if h4 and '프로그램 소개' in h4.get_text():
-            txt_div = section.find('div', class_='txt')
-            if txt_div and txt_div.find('p'):
-                program_sections.append(txt_div)
-
-    if not program_sections:
-        for div in soup.find_all('div'):
-            img = div.find('img', alt='프로그램 소개')
-            if img:
-                parent_section = div.parent
-                txt_div = parent_section.find('div', class_='txt')
-                if txt_div and txt_div.find('p'):
-                    program_sections.append(txt_div)
-
-    all_text = []
-    for section in program_sections:
-        p_tags = section.find_all('p')
-        for p in p_tags:
-            text = p.get_text()
-            clean_text = '\n'.join([line.strip() for line in text.splitlines() if line.strip()])
-            all_text.append(clean_text)
-
-    return '\n\n'.join(all_text) if all_text else None
-
-def crawl_templestay_details(url, driver=None):
-    close_driver = False
-    if driver is None:
-        driver = create_driver()
-        close_driver = True
-    
-    try:
-        logger.info(f"크롤링 시작: {url}")
-        driver.get(url)
-        time.sleep(0.8)
-
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        place_div = soup.find('div', class_='place')
-        if not place_div:
-            logger.warning(f"place div 없음: {url}")
-            return (None, None, None, None, None, None, [])
-
-        templestay_name = place_div.find('h3').get_text(strip=True) if place_div.find('h3') else None
-
-        temple_name = None
-        address = None
-        phone = None
-
-        info_div = place_div.find('div', class_='info')
-        if info_div:
-            lis = info_div.find_all('li')
-            for li in lis:
-                img = li.find('img')
-                text_label = img['alt'] if img and 'alt' in img.attrs else ''
-                text_nodes = li.find_all(text=True, recursive=False)
-                text_value = ''.join(t.strip() for t in text_nodes if t.strip())
-
-                if '주소' in text_label:
-                    parts = [p.strip() for p in text_value.split(',', 1)]
-                    if len(parts) == 2:
-                        temple_name = parts[0]
-                        address = parts[1]
-                    else:
-                        address = text_value
-                elif '연락처' in text_label or re.search(r'\d{2,3}[-\s]?\d{3,4}[-\s]?\d{4}', text_value):
-                    phone = extract_phone_number(text_value) or phone
-
-        introduction = extract_introduction_text(soup)
-
-        schedule_json = None
-        for section in soup.find_all("div", class_="section"):
-            h4 = section.find("h4")
-            if h4 and "프로그램 일정" in h4.get_text():
-                schedule_div = section.find("div", class_="table")
-                if schedule_div:
-                    table = schedule_div.find("table")
-                    if table:
-                        schedule_json = parse_program_schedule(str(table))
-                break
-
-        # 이미지 URL 추출
-        image_urls = extract_image_urls(soup)
-
-        logger.info(f"크롤링 완료: {templestay_name} ({temple_name}), 이미지 {len(image_urls)}개")
-
-        return (templestay_name, temple_name, address, phone, introduction, schedule_json, image_urls)
+def crawl_templestay_details(url, fetcher=None, known_hash=None):
+    # 반환값: 상세 정보 7개 + content_hash. 저장된 해시와 같으면 None
+    close_fetcher = False
+    if fetcher is None:
+        fetcher = create_detail_fetcher()
+        close_fetcher = True
 
+    try:
+        return fetch_templestay_details(url, fetcher, known_hash)
     except Exception as e:
         logger.error(f"크롤링 실패 ({url}): {e}")
-        return (None, None, None, None, None, None, [])
+        return EMPTY_DETAILS
     finally:
-        if close_driver:
-            driver.quit()
+        if close_fetcher:
+            fetcher.close()
 
-def fetch_urls_from_db():
+def fetch_urls_from_db(full_refresh=False):
     conn = get_connection()
     cursor = conn.cursor(buffered=True)
     try:
-        cursor.execute("SELECT id, url FROM templestay WHERE templestay_name IS NULL ORDER BY id")
-        results = cursor.fetchall()
-        logger.info(f"templestay_name이 NULL인 {len(results)}개의 URL 불러옴")
+        ensure_hash_column(conn, 'templestay')
+        if full_refresh:
+            cursor.execute("SELECT id, url, content_hash FROM templestay ORDER BY id")
+            results = cursor.fetchall()
+            logger.info(f"전체 {len(results)}개의 URL 불러옴 (증분 재크롤링)")
+        else:
+            cursor.execute("SELECT id, url, content_hash FROM templestay WHERE templestay_name IS NULL ORDER BY id")
+            results = cursor.fetchall()
+            logger.info(f"templestay_name이 NULL인 {len(results)}개의 URL 불러옴")
         return results
     finally:
         cursor.close()
@@ -262,142 +136,192 @@ def update_templestay_batch(batch_data):
         return 0
 
     conn = get_connection()
-    cursor = conn.cursor()
     success_count = 0
 
     try:
-        query = """
-            UPDATE templestay 
-            SET templestay_name = %s,
-                temple_name = %s,
-                address = %s,
-                phone = %s,
-                introduction = %s, 
-                schedule = %s,
-                updated_at = NOW()
-            WHERE id = %s
-        """
-        cursor.executemany(query, batch_data)
-        conn.commit()
-        success_count = cursor.rowcount
+        # 임시 테이블에 한 번에 넣고 UPDATE ... JOIN 한 문장으로 반영
+        success_count = bulk_update_templestay(conn, batch_data)
         logger.info(f"배치 업데이트 완료: {success_count}건")
-
     except Exception as e:
         logger.error(f"배치 업데이트 실패: {e}")
-        conn.rollback()
     finally:
-        cursor.close()
         conn.close()
 
     return success_count
 
-def insert_images_batch(image_data):
-    """이미지 데이터를 배치로 삽입하는 함수"""
+def sync_images_batch(image_data):
+    """templestay별 이미지 목록을 DB와 비교해 추가/삭제분만 반영하는 함수. 실패하면 예외를 그대로 올린다"""
     if not image_data:
         return 0
 
     conn = get_connection()
-    cursor = conn.cursor()
-    success_count = 0
-
     try:
-        query = """
-            INSERT INTO image (templestay_id, img_url, created_at) 
-            VALUES (%s, %s, NOW())
-        """
-        cursor.executemany(query, image_data)
-        conn.commit()
-        success_count = cursor.rowcount
-        logger.info(f"이미지 배치 삽입 완료: {success_count}건")
-
-    except Exception as e:
-        logger.error(f"이미지 배치 삽입 실패: {e}")
-        conn.rollback()
+        success_count, removed_count = sync_images(conn, image_data)
+        logger.info(f"이미지 동기화 완료: 추가 {success_count}건, 삭제 {removed_count}건")
     finally:
-        cursor.close()
         conn.close()
 
     return success_count
 
-def process_url_batch(urls_batch):
-    driver = create_driver()
-    batch_data = []
-    image_data = []
-    
+def process_url_batch(urls_batch, writer, journal, fetcher_factory=None):
+    # fetcher_factory: 벤치마크에서 스텁 서버용 페처를 넣을 때만 사용
+    fetcher = (fetcher_factory or create_detail_fetcher)()
+    processed = 0
+    unchanged = 0
+
     try:
-        for templestay_id, url in urls_batch:
-            templestay_name, temple_name, address, phone, introduction, schedule, image_urls = crawl_templestay_details(url, driver)
-            
-            if templestay_name or temple_name or address or phone or introduction or schedule:
-                batch_data.append((
-                    templestay_name,
-                    temple_name,
-                    address,
-                    phone,
-                    introduction,
-                    schedule,
-                    templestay_id
-                ))
-            
-            # 이미지 URL이 있으면 이미지 데이터에 추가
-            for img_url in image_urls:
-                image_data.append((templestay_id, img_url))
+        for templestay_id, url, known_hash in urls_batch:
+            processed += 1
+            try:
+                result = fetch_templestay_details(url, fetcher, known_hash)
+            except Exception as e:
+                logger.error(f"크롤링 실패 ({url}): {e}")
+                journal.record_failure(templestay_id, url, e)
+                continue
+
+            if result is None:
+                unchanged += 1
+                journal.record_success(templestay_id, url, status='unchanged')
+                continue
+
+            templestay_name, temple_name, address, phone, introduction, schedule, image_urls, content_hash = result
+
+            if not (templestay_name or temple_name or address or phone or introduction or schedule):
+                # 아무 필드도 못 찾은 페이지는 저장할 것이 없고 templestay_name이 NULL로 남으므로
+                # 실패로 기록해 max_attempts를 넘으면 더 이상 시도하지 않는다 (이미지도 건드리지 않음)
+                logger.warning(f"추출된 필드 없음: {url}")
+                journal.record_failure(templestay_id, url, "추출된 필드 없음")
+                continue
+
+            # 이미지 저장이 실패하면 writer가 이 행을 실패로 바꾼다
+            journal.record_pending(templestay_id, url)
+
+            # 이미지를 먼저 넣어야 templestay 기록 시점에 해당 이미지도 함께 저장된다
+            # (이미지를 하나도 못 찾은 경우 렌더링 실패일 수 있으므로 기존 이미지를 지우지 않음)
+            if image_urls:
+                writer.put('image', (templestay_id, image_urls))
             
-            time.sleep(0.2)
+            writer.put('templestay', (
+                templestay_name,
+                temple_name,
+                address,
+                phone,
+                introduction,
+                schedule,
+                content_hash,
+                templestay_id
+            ))
     finally:
-        driver.quit()
+        fetcher.close()
     
-    return batch_data, image_data
+    return processed, unchanged
 
-def main(batch_size=20, max_workers=3):
+def write_image_records(journal, records, failed_ids):
+    # 이미지 저장이 실패한 페이지는 저널에 실패로 남기고, templestay도 기록하지 않도록 failed_ids에 넣는다
+    # (templestay_name이 채워지면 다음 실행에서 다시 크롤링하지 않으므로)
     try:
-        try:
-            init_connection_pool()
-        except Exception as e:
-            logger.warning(f"연결 풀 초기화 실패, 단일 연결 모드로 전환: {e}")
+        return sync_images_batch(records)
+    except Exception as e:
+        logger.error(f"이미지 동기화 실패: {e}")
+        ids = [templestay_id for templestay_id, _ in records]
+        journal.record_failures(ids, f"이미지 저장 실패: {e}")
+        failed_ids.update(ids)
+        return 0
+
+def write_templestay_records(journal, records, failed_ids=None):
+    # DB에 실제로 저장된 뒤에만 저널에 완료로 기록
+    if failed_ids:
+        records = [record for record in records if record[-1] not in failed_ids]
+        if not records:
+            return 0
+    success_count = update_templestay_batch(records)
+    ids = [record[-1] for record in records]
+    if success_count:
+        journal.record_successes(ids)
+    else:
+        journal.record_failures(ids, "DB 저장 실패")
+    return success_count
+
+def create_writer(journal, max_queue=1000, flush_interval=5.0):
+    # templestay는 100건, 이미지는 templestay 50개 단위로 크롤링 도중에 바로 저장
+    image_failed = set()
+    return StreamingWriter({
+        'image': (lambda records: write_image_records(journal, records, image_failed), 50),
+        'templestay': (lambda records: write_templestay_records(journal, records, image_failed), 100),
+    }, max_queue=max_queue, flush_interval=flush_interval, flush_before={'templestay': ['image']}).start()
+
+def main(batch_size=20, max_workers=3, warm_drivers=0, max_pages_per_driver=200,
+         flush_interval=5.0, max_queue=1000, full_refresh=False, max_attempts=3, fetch_images=False,
+         parse_workers=None):
+    # max_workers: 페치 스레드 수, parse_workers: 파싱 프로세스 수
+    # (None이면 CPU 코어 수와 페치 스레드 수 중 작은 값, 0이면 페치 스레드에서 파싱)
+    journal = CrawlJournal(max_attempts=max_attempts)
+    try:
+        # 작성 스레드(writer)와 페치 스레드가 함께 쓰므로 여유 있게 잡는다
+        init_pool(size=max_workers + 2)
 
-        url_data = fetch_urls_from_db()
-        logger.info(f"전체 처리 대상: {len(url_data)}개")
+        init_driver_pool(max_workers, warm=warm_drivers, max_pages=max_pages_per_driver)
+
+        run_id, resumed = journal.begin_run()
+        url_data = journal.select_work(fetch_urls_from_db(full_refresh))
+        logger.info(f"전체 처리 대상: {len(url_data)}개 (실행 #{run_id}{', 이어서 진행' if resumed else ''})")
 
-        successful_updates = 0
-        successful_images = 0
         batches = [url_data[i:i+batch_size] for i in range(0, len(url_data), batch_size)]
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_batch = {executor.submit(process_url_batch, batch): batch for batch in batches}
-            all_batch_data = []
-            all_image_data = []
-
-            for future in as_completed(future_to_batch):
-                try:
-                    batch_data, image_data = future.result()
-                    all_batch_data.extend(batch_data)
-                    all_image_data.extend(image_data)
-                except Exception as e:
-                    logger.error(f"배치 처리 중 오류 발생: {e}")
-
-            # templestay 데이터 업데이트
-            if all_batch_data:
-                bulk_batch_size = 100
-                for i in range(0, len(all_batch_data), bulk_batch_size):
-                    bulk_batch = all_batch_data[i:i + bulk_batch_size]
-                    success_count = update_templestay_batch(bulk_batch)
-                    successful_updates += success_count
-
-            # 이미지 데이터 삽입
-            if all_image_data:
-                bulk_batch_size = 200  # 이미지는 더 많은 수로 배치 처리
-                for i in range(0, len(all_image_data), bulk_batch_size):
-                    bulk_batch = all_image_data[i:i + bulk_batch_size]
-                    success_count = insert_images_batch(bulk_batch)
-                    successful_images += success_count
-
-        logger.info(f"작업 완료: templestay {successful_updates}건, 이미지 {successful_images}건 처리 성공")
+        # 파싱 프로세스는 처리할 페이지가 있을 때만 띄운다 (페치 스레드보다 많이 띄워도 놀기만 한다)
+        if url_data:
+            if parse_workers is None:
+                parse_workers = min(os.cpu_count() or 1, max_workers)
+            init_parse_pool(parse_workers)
+
+        unchanged = 0
+
+        writer = create_writer(journal, max_queue, flush_interval)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_batch = {executor.submit(process_url_batch, batch, writer, journal): batch for batch in batches}
+
+                for future in as_completed(future_to_batch):
+                    try:
+                        _, batch_unchanged = future.result()
+                        unchanged += batch_unchanged
+                    except Exception as e:
+                        logger.error(f"배치 처리 중 오류 발생: {e}")
+        finally:
+            written = writer.close()
+
+        journal.finish_run()
+        logger.info(f"작업 완료: templestay {written['templestay']}건, 이미지 {written['image']}건 처리 성공, 변경 없음 {unchanged}건")
+        logger.info(f"크롤링 상태 - {journal.summary()}")
+        logger.info(f"DB 쓰기 처리량 - {bulk_stats.summary()}")
+        fetch_stats.log_summary()
+        logger.info(f"단계별 측정 - {metrics.summary()}")
+        logger.info(f"페이지 캐시 통계 - {get_page_cache().stats}")
+        logger.info(f"요청 재시도 {http_session.retries}회, 호스트별 속도 {http_session.limiter.rates()}")
+
+        if fetch_images:
+            # 선택 단계: Pillow가 필요하므로 사용할 때만 불러온다
+            from image_store import process_images
+            conn = get_connection()
+            try:
+                process_images(conn)
+            finally:
+                conn.close()
 
     except Exception as e:
         logger.error(f"프로그램 실행 중 오류 발생: {e}")
         import traceback
         logger.error(f"상세 오류 내용: {traceback.format_exc()}")
+    finally:
+        if parse_pool is not None:
+            parse_pool.close()
+        if driver_pool is not None:
+            driver_pool.close()
+            logger.info(f"드라이버 풀 통계 - {driver_pool.summary()}")
+        journal.close()
+        close_pool()
+        metrics.write_report('templestay')
 
 if __name__ == "__main__":
     main(batch_size=10, max_workers=1)
\ No newline at end of file
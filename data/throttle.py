@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class TokenBucket:
+    """초당 rate개의 토큰을 채우는 토큰 버킷 (동기/비동기 공용)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.capacity = max(1.0, self.rate)
+
+    def reserve(self):
+        # 토큰 하나를 예약하고, 사용 가능해질 때까지 기다려야 하는 시간을 돌려준다
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class HostState:
+    def __init__(self, rate):
+        self.bucket = TokenBucket(rate)
+        self.rate = rate
+        self.latency = None
+
+class AdaptiveRateLimiter:
+    """호스트별 AIMD 속도 제한. 정상 응답이면 조금씩 빨라지고 429/5xx/지연 증가 시 절반으로 줄인다"""
+
+    def __init__(self, initial_rate=2.0, min_rate=0.2, max_rate=20.0, increase=0.1,
+                 decrease=0.5, latency_factor=3.0, latency_alpha=0.2):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.latency_alpha = latency_alpha
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = HostState(self.initial_rate)
+                self._hosts[host] = state
+            return state
+
+    def wait(self, url):
+        self._state(url).bucket.wait()
+
+    async def acquire(self, url):
+        await self._state(url).bucket.acquire()
+
+    def feedback(self, url, status, latency):
+        # status가 None이면 연결 오류/타임아웃
+        state = self._state(url)
+        with self._lock:
+            slow = state.latency is not None and latency > state.latency * self.latency_factor
+            if status is None or status in RETRY_STATUSES or slow:
+                rate = max(self.min_rate, state.rate * self.decrease)
+            else:
+                rate = min(self.max_rate, state.rate + self.increase)
+                if state.latency is None:
+                    state.latency = latency
+                else:
+                    state.latency += self.latency_alpha * (latency - state.latency)
+            changed = rate != state.rate
+            state.rate = rate
+        if changed:
+            state.bucket.set_rate(rate)
+
+    def rates(self):
+        with self._lock:
+            return {host: round(state.rate, 2) for host, state in self._hosts.items()}
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """지터가 들어간 지수 백오프. Retry-After 헤더가 있으면 그 값을 따른다"""
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0, retry_statuses=RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+
+    def delay(self, attempt, retry_after=None):
+        retry_after = parse_retry_after(retry_after)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+def default_limiter():
+    # 같은 프로세스의 모든 크롤러가 호스트별 속도 상태를 공유
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = AdaptiveRateLimiter()
+        return _default_limiter
+
+class PoliteSession:
+    """requests.Session을 감싸 속도 제한과 재시도를 적용 (get 인터페이스는 동일)"""
+
+    def __init__(self, session, limiter=None, policy=None):
+        self.session = session
+        self.limiter = limiter or default_limiter()
+        self.policy = policy or RetryPolicy()
+        self.retries = 0
+
+    def get(self, url, **kwargs):
+        for attempt in range(self.policy.max_retries + 1):
+            self.limiter.wait(url)
+            started = time.monotonic()
+            try:
+                res = self.session.get(url, **kwargs)
+            except Exception as e:
+                self.limiter.feedback(url, None, time.monotonic() - started)
+                if attempt == self.policy.max_retries:
+                    raise
+                delay = self.policy.delay(attempt)
+                logger.warning(f"요청 실패, {delay:.1f}s 후 재시도 ({url}): {e}")
+            else:
+                self.limiter.feedback(url, res.status_code, time.monotonic() - started)
+                if res.status_code not in self.policy.retry_statuses or attempt == self.policy.max_retries:
+                    return res
+                delay = self.policy.delay(attempt, res.headers.get('Retry-After'))
+                logger.warning(f"HTTP {res.status_code}, {delay:.1f}s 후 재시도 ({url})")
+            self.retries += 1
+            metrics.inc('retries')
+            time.sleep(delay)
+
+class PoliteAsyncSession:
+    """aiohttp.ClientSession용 PoliteSession. get()은 async with로 사용"""
+
+    def __init__(self, session, limiter=None, policy=None):
+        self.session = session
+        self.limiter = limiter or default_limiter()
+        self.policy = policy or RetryPolicy()
+        self.retries = 0
+
+    async def _request(self, url, **kwargs):
+        for attempt in range(self.policy.max_retries + 1):
+            await self.limiter.acquire(url)
+            started = time.monotonic()
+            try:
+                res = await self.session.get(url, **kwargs)
+                await res.read()
+            except Exception as e:
+                self.limiter.feedback(url, None, time.monotonic() - started)
+                if attempt == self.policy.max_retries:
+                    raise
+                delay = self.policy.delay(attempt)
+                logger.warning(f"요청 실패, {delay:.1f}s 후 재시도 ({url}): {e}")
+            else:
+                res.release()
+                self.limiter.feedback(url, res.status, time.monotonic() - started)
+                if res.status not in self.policy.retry_statuses or attempt == self.policy.max_retries:
+                    return res
+                delay = self.policy.delay(attempt, res.headers.get('Retry-After'))
+                logger.warning(f"HTTP {res.status}, {delay:.1f}s 후 재시도 ({url})")
+            self.retries += 1
+            metrics.inc('retries')
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def get(self, url, **kwargs):
+        yield await self._request(url, **kwargs)
@@ -0,0 +1,109 @@
+import os
+import pickle
+import re
+import sqlite3
+
+URL_INDEX_PATH = 'url_index.sqlite'
+LEGACY_CACHE_PATH = 'url_cache.pkl'
+
+RESERVE_URL_RE = re.compile(r"templestaySeq=(\d+)&templeBookMarkId=([\w_]+)")
+
+def build_reserve_url(seq, bookmark_id):
+    return (
+        "https://www.templestay.com/fe/MI000000000000000062/reserve/view.do"
+        f"?pageIndex=1&areaCd=&templestaySeq={seq}&templeBookMarkId={bookmark_id}"
+        "&templeIdTmp=&areaSelect=&templeId=&templePrgType=&searchCnt=&searchStaDate=&searchEndDate=&searchKeyword="
+    )
+
+def parse_reserve_url(url):
+    match = RESERVE_URL_RE.search(url or "")
+    return match.groups() if match else None
+
+class UrlIndex:
+    """수집한 예약 URL을 (templestaySeq, templeBookMarkId) 키로 저장하는 SQLite 색인.
+    새 키만 추가하고(append-only), WAL 모드라 remove_url이 크롤링 도중에도 읽을 수 있다"""
+
+    def __init__(self, path=URL_INDEX_PATH, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+            self._keys = None
+        else:
+            self._conn = sqlite3.connect(path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    seq TEXT NOT NULL,
+                    bookmark_id TEXT NOT NULL,
+                    added_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (seq, bookmark_id)
+                ) WITHOUT ROWID
+            """)
+            self._conn.commit()
+            # 쓰기 쪽은 키를 메모리에 올려 membership을 O(1)로 확인
+            self._keys = set(self._conn.execute("SELECT seq, bookmark_id FROM urls"))
+        self._pending = []
+
+    def __contains__(self, key):
+        if self._keys is not None:
+            return key in self._keys
+        row = self._conn.execute(
+            "SELECT 1 FROM urls WHERE seq = ? AND bookmark_id = ?", key
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        if self._keys is not None:
+            return len(self._keys)
+        return self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def add(self, key):
+        # 새 키면 True. flush() 전까지는 메모리에만 있다
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._pending.append(key)
+        return True
+
+    def flush(self):
+        # 이번 배치에서 추가된 키만 기록하므로 비용이 전체 크기와 무관
+        if not self._pending:
+            return 0
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO urls (seq, bookmark_id) VALUES (?, ?)", self._pending
+            )
+        written = len(self._pending)
+        self._pending = []
+        return written
+
+    def discard_pending(self):
+        # DB 저장에 실패한 배치의 키를 되돌려 다음 실행(또는 이번 실행의 다음 등장)에서 다시 시도
+        discarded = len(self._pending)
+        self._keys.difference_update(self._pending)
+        self._pending = []
+        return discarded
+
+    def keys(self):
+        return self._conn.execute("SELECT seq, bookmark_id FROM urls ORDER BY seq, bookmark_id")
+
+    def urls(self):
+        for seq, bookmark_id in self.keys():
+            yield build_reserve_url(seq, bookmark_id)
+
+    def import_legacy_cache(self, path=LEGACY_CACHE_PATH):
+        # 기존 url_cache.pkl(전체 URL set)을 한 번만 옮겨 온다
+        if len(self) or not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            urls = pickle.load(f)
+        for url in urls:
+            key = parse_reserve_url(url)
+            if key:
+                self.add(key)
+        return self.flush()
+
+    def close(self):
+        # flush하지 않은 키는 DB 저장이 끝나지 않은 것이므로 버린다
+        self._conn.close()
@@ -1,11 +1,19 @@
-import requests
+import asyncio
+import aiohttp
 from bs4 import BeautifulSoup
-import mysql.connector
 import re
-import time
-import pickle
-import os
-import yaml
+
+from bulk import bulk_insert_urls, bulk_stats
+from db import close_pool, get_async_pool, get_connection
+from fetcher import create_session
+from metrics import metrics
+from page_cache import fetch_cached, fetch_cached_async, get_page_cache
+from throttle import AdaptiveRateLimiter, PoliteAsyncSession, PoliteSession
+from url_index import UrlIndex, build_reserve_url
+
+LIST_URL = "https://www.templestay.com/fe/MI000000000000000062/templestay/prgList.do?pageIndex="
+
+http_session = PoliteSession(create_session())
 
 TYPE_BIT_MAP = {
     "당일형": 0b001,
@@ -13,30 +21,6 @@ TYPE_BIT_MAP = {
     "체험형": 0b100,
 }
 
-def load_db_config(file_path):
-    with open(file_path, "r", encoding="utf-8") as file:
-        config = yaml.safe_load(file)
-        return config.get("database")
-
-def get_connection(config):
-    try:
-        return mysql.connector.connect(
-            host=config["host"],
-            user=config["user"],
-            password=config["password"],
-            database=config["database"]
-        )
-    except mysql.connector.Error as e:
-        print(f"DB 연결 오류: {e}")
-        return None
-
-def build_reserve_url(seq, bookmark_id):
-    return (
-        "https://www.templestay.com/fe/MI000000000000000062/reserve/view.do"
-        f"?pageIndex=1&areaCd=&templestaySeq={seq}&templeBookMarkId={bookmark_id}"
-        "&templeIdTmp=&areaSelect=&templeId=&templePrgType=&searchCnt=&searchStaDate=&searchEndDate=&searchKeyword="
-    )
-
 def type_to_binary(type_text):
     return TYPE_BIT_MAP.get(type_text.strip(), 0)
 
@@ -56,107 +40,180 @@ def extract_url_and_type(li):
         if bit:
             type_bits |= bit
 
-    program_id = seq
-    return full_url, type_bits, program_id
+    return full_url, type_bits, (seq, bookmark_id)
 
-def load_url_cache():
-    if os.path.exists('url_cache.pkl'):
-        with open('url_cache.pkl', 'rb') as f:
-            return pickle.load(f)
-    return set()
-
-def save_url_cache(url_set):
-    with open('url_cache.pkl', 'wb') as f:
-        pickle.dump(url_set, f)
+def open_url_index():
+    url_index = UrlIndex()
+    migrated = url_index.import_legacy_cache()
+    if migrated:
+        print(f">> url_cache.pkl에서 URL {migrated}건을 색인으로 옮김")
+    return url_index
 
 def batch_insert_and_upsert(conn, url_type_list):
+    # 저장에 성공했으면(또는 저장할 것이 없으면) True
     if not url_type_list:
-        return
-
-    cursor = conn.cursor(dictionary=True)
+        return True
 
     try:
-        valid_url_type_list = [(url, type_bits, program_id) for url, type_bits, program_id in url_type_list if type_bits > 0]
+        valid_url_type_list = [(url, type_bits) for url, type_bits, _ in url_type_list if type_bits > 0]
         if not valid_url_type_list:
-            return
-
-        url_params = [(url,) for url, _, _ in valid_url_type_list]
-        cursor.executemany("INSERT IGNORE INTO templestay (url) VALUES (%s)", url_params)
-
-        url_to_type = {url: type_bits for url, type_bits, _ in valid_url_type_list}
-        url_keys_tuple = tuple(url_to_type.keys())
-
-        if url_keys_tuple:
-            placeholders = ','.join(['%s'] * len(url_keys_tuple))
-            query = f"SELECT id, url FROM templestay WHERE url IN ({placeholders})"
-            cursor.execute(query, url_keys_tuple)
-            rows = cursor.fetchall()
-        else:
-            rows = []
-
-        filter_data = [(row["id"], url_to_type[row["url"]]) for row in rows]
-        cursor.executemany("""
-            INSERT INTO filter (templestay_id, type)
-            VALUES (%s, %s)
-            ON DUPLICATE KEY UPDATE type=VALUES(type)
-        """, filter_data)
-
-        conn.commit()
+            return True
+
+        # URL 등록과 filter.type 반영을 임시 테이블 JOIN으로 처리해 id 재조회가 필요 없음
+        bulk_insert_urls(conn, valid_url_type_list)
+        return True
     except Exception as e:
         print(f"DB 작업 중 오류 발생: {e}")
-        conn.rollback()
-    finally:
-        cursor.close()
+        return False
+
+def finish_batch(url_index, saved, size, label="배치"):
+    # 색인에는 DB에 실제로 저장된 키만 남긴다
+    if saved:
+        print(f">> {label} {size}건 DB 저장 완료")
+        url_index.flush()
+    else:
+        url_index.discard_pending()
+        print(f">> {label} {size}건 저장 실패, 색인에 남기지 않음 (다음 실행에서 다시 시도)")
+
+def parse_listing_page(html):
+    metrics.inc('pages')
+    with metrics.time('parse'):
+        soup = BeautifulSoup(html, 'html.parser')
+        list_items = soup.select('div.myplace_list > ul > li')
+        return [extract_url_and_type(li) for li in list_items]
+
+def iter_listing_pages(start_page, end_page, base_url=LIST_URL, cache=None):
+    for page in range(start_page, end_page + 1):
+        try:
+            print(f"{page} 페이지 처리 중")
+            html = fetch_cached(http_session, base_url + str(page), cache)
+            entries = parse_listing_page(html)
+            if entries:
+                yield page, entries
+        except Exception as e:
+            print(f"{page} 페이지 에러: {e}")
+
+async def fetch_listing_pages(start_page, end_page, base_url=LIST_URL, concurrency=8, rate_per_host=5.0,
+                              cache=None):
+    # 동시에 concurrency개 페이지까지 요청하고, 첫 빈 페이지를 만나면 그 뒤 페이지는 요청하지 않는다
+    # rate_per_host는 시작 속도이며 응답 상태에 따라 AIMD로 조절된다
+    limiter = AdaptiveRateLimiter(initial_rate=rate_per_host)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    timeout = aiohttp.ClientTimeout(total=10)
+    pages = {}
+    next_page = start_page
+    last_page = end_page
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as client:
+        session = PoliteAsyncSession(client, limiter)
+
+        async def worker():
+            nonlocal next_page, last_page
+            while next_page <= last_page:
+                page = next_page
+                next_page += 1
+                try:
+                    html = await fetch_cached_async(session, base_url + str(page), cache)
+                except Exception as e:
+                    print(f"{page} 페이지 에러: {e}")
+                    continue
+
+                entries = parse_listing_page(html)
+                if not entries:
+                    last_page = min(last_page, page - 1)
+                    continue
+                pages[page] = entries
+                print(f"{page} 페이지 처리 완료")
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return [(page, pages[page]) for page in sorted(pages) if page <= last_page]
+
+def new_entries(entries, url_index):
+    # 색인에 없는 항목만 돌려주고 색인에 추가 (flush는 DB 저장 후에)
+    for url, type_bits, url_key in entries:
+        if not url or type_bits == 0 or url_key in url_index:
+            continue
+        url_index.add(url_key)
+        yield url, type_bits, url_key
+
+def queue_entries(conn, entries, url_index, batch, batch_size):
+    for entry in new_entries(entries, url_index):
+        batch.append(entry)
+
+        if len(batch) >= batch_size:
+            finish_batch(url_index, batch_insert_and_upsert(conn, batch), len(batch))
+            batch.clear()
 
-def crawl_and_process(config, start_page=1, end_page=50, batch_size=100):
-    base_url = "https://www.templestay.com/fe/MI000000000000000062/templestay/prgList.do?pageIndex="
-    conn = get_connection(config)
+def flush_last_batch(conn, batch, url_index):
+    if batch:
+        finish_batch(url_index, batch_insert_and_upsert(conn, batch), len(batch), "마지막 배치")
+
+def connect_or_none():
+    try:
+        return get_connection()
+    except Exception as e:
+        print(f"DB 연결 오류: {e}")
+        return None
+
+def crawl_and_process(start_page=1, end_page=50, batch_size=100, base_url=LIST_URL):
+    conn = connect_or_none()
     if not conn:
         print("DB 연결 실패로 크롤링 중단")
         return
 
-    url_cache = load_url_cache()
+    url_index = open_url_index()
     batch = []
 
     try:
-        for page in range(start_page, end_page + 1):
-            try:
-                print(f"{page} 페이지 처리 중")
-                res = requests.get(base_url + str(page), timeout=10)
-                res.raise_for_status()
-
-                soup = BeautifulSoup(res.text, 'html.parser')
-                list_items = soup.select('div.myplace_list > ul > li')
-                if not list_items:
-                    continue
-
-                for li in list_items:
-                    url, type_bits, program_id = extract_url_and_type(li)
-                    if not url or url in url_cache or type_bits == 0:
-                        continue
-                    batch.append((url, type_bits, program_id))
-                    url_cache.add(url)
-
-                    if len(batch) >= batch_size:
-                        batch_insert_and_upsert(conn, batch)
-                        print(f">> {len(batch)}건 DB 저장 완료")
-                        batch.clear()
-                        save_url_cache(url_cache)
-
-                time.sleep(1)
+        for _, entries in iter_listing_pages(start_page, end_page, base_url):
+            queue_entries(conn, entries, url_index, batch, batch_size)
+        flush_last_batch(conn, batch, url_index)
+        print(f">> 페이지 캐시: {get_page_cache().stats}")
+        print(f">> DB 쓰기 처리량: {bulk_stats.summary()}")
+        print(f">> 단계별 측정: {metrics.summary()}")
+    finally:
+        url_index.close()
+        conn.close()
+        metrics.write_report('url_type')
 
-            except Exception as e:
-                print(f"{page} 페이지 에러: {e}")
+async def store_pages(conn, pages, url_index, batch_size):
+    # UrlIndex(SQLite)는 이벤트 루프 스레드에서만 쓰고, MySQL 쓰기만 conn.run으로 스레드에 넘긴다
+    batch = []
+    for _, entries in pages:
+        for entry in new_entries(entries, url_index):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                finish_batch(url_index, await conn.run(batch_insert_and_upsert, batch), len(batch))
+                batch = []
+    if batch:
+        finish_batch(url_index, await conn.run(batch_insert_and_upsert, batch), len(batch), "마지막 배치")
+
+async def crawl_and_process_async(start_page=1, end_page=50, batch_size=100,
+                                  concurrency=8, rate_per_host=5.0, base_url=LIST_URL):
+    try:
+        conn = await get_async_pool().acquire()
+    except Exception as e:
+        print(f"DB 연결 오류: {e}")
+        print("DB 연결 실패로 크롤링 중단")
+        return
 
-        if batch:
-            batch_insert_and_upsert(conn, batch)
-            print(f">> 마지막 배치 {len(batch)}건 DB 저장 완료")
-            save_url_cache(url_cache)
+    url_index = open_url_index()
 
+    try:
+        pages = await fetch_listing_pages(start_page, end_page, base_url, concurrency, rate_per_host)
+        print(f">> {len(pages)}개 페이지 수집 완료")
+        await store_pages(conn, pages, url_index, batch_size)
+        print(f">> 페이지 캐시: {get_page_cache().stats}")
+        print(f">> DB 쓰기 처리량: {bulk_stats.summary()}")
+        print(f">> 단계별 측정: {metrics.summary()}")
     finally:
-        conn.close()
+        url_index.close()
+        await conn.close()
+        metrics.write_report('url_type')
 
 if __name__ == "__main__":
-    db_config_path = "C:\\jeolloga-crawling\\data\\db_config.yaml"
-    db_config = load_db_config(db_config_path)
-    crawl_and_process(db_config, start_page=1, end_page=50)
\ No newline at end of file
+    try:
+        asyncio.run(crawl_and_process_async(start_page=1, end_page=50))
+    finally:
+        close_pool()
@@ -0,0 +1,75 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class StreamingWriter:
+    """크롤러 스레드가 넣은 레코드를 모아 크기/시간 기준으로 DB에 쓰는 전용 스레드"""
+
+    def __init__(self, sinks, max_queue=1000, flush_interval=5.0, flush_before=None):
+        # sinks: {종류: (flush 함수, 배치 크기)}
+        # flush_before: {종류: [먼저 기록해야 하는 종류, ...]}
+        self.sinks = sinks
+        self.flush_before = flush_before or {}
+        self.flush_interval = flush_interval
+        self.pending = {kind: [] for kind in sinks}
+        self.written = {kind: 0 for kind in sinks}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, kind, record):
+        # 큐가 가득 차면 writer가 따라올 때까지 크롤러 스레드가 대기 (backpressure)
+        self._queue.put((kind, record))
+
+    def _flush(self, kind):
+        for dependency in self.flush_before.get(kind, ()):
+            self._flush(dependency)
+        records = self.pending[kind]
+        if not records:
+            return
+        flush_fn, _ = self.sinks[kind]
+        self.pending[kind] = []
+        try:
+            self.written[kind] += flush_fn(records) or 0
+        except Exception as e:
+            logger.error(f"{kind} 쓰기 실패 ({len(records)}건): {e}")
+
+    def _flush_all(self):
+        for kind in self.sinks:
+            self._flush(kind)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush_all()
+                return
+
+            if item is not None:
+                kind, record = item
+                self.pending[kind].append(record)
+                if len(self.pending[kind]) >= self.sinks[kind][1]:
+                    self._flush(kind)
+
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_all()
+                last_flush = time.monotonic()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+        return self.written